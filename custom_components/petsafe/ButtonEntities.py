@@ -1,15 +1,15 @@
 from homeassistant.components.button import ButtonEntity
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 import petsafe
 
-from . import PetSafeCoordinator
 from .const import DOMAIN, FEEDER_MODEL_GEN1, MANUFACTURER
+from .coordinator import PetSafeCoordinator
+from .entity import PetSafeEntity
 
 
-class PetSafeButtonEntity(CoordinatorEntity, ButtonEntity):
+class PetSafeButtonEntity(PetSafeEntity, ButtonEntity):
     def __init__(
         self,
         hass: HomeAssistant,
@@ -20,13 +20,12 @@ class PetSafeButtonEntity(CoordinatorEntity, ButtonEntity):
         icon: str = None,
         device_class: str = None,
     ):
-        super().__init__(coordinator)
+        super().__init__(coordinator, api_name)
         self._attr_name = name
         self._attr_device_class = device_class
         self._attr_has_entity_name = True
         self._coordinator = coordinator
         self._api_name = api_name
-        self._attr_should_poll = True
         self._attr_unique_id = api_name + "_" + device_type
         self._attr_icon = icon
         self._device_type = device_type
@@ -65,10 +64,19 @@ class PetSafeLitterboxButtonEntity(PetSafeButtonEntity):
 
     async def async_press(self) -> None:
         if self._device_type == "reset":
-            await self._device.reset(0, False)
+            await self._coordinator.async_send_command(
+                self._api_name,
+                lambda litterbox: litterbox.reset(0, False),
+                ("shadow", "state", "reported", "rakeCount"),
+                0,
+            )
         elif self._device_type == "clean":
-            await self._device.rake(False)
-        await self.coordinator.async_request_refresh()
+            await self._coordinator.async_send_command(
+                self._api_name, lambda litterbox: litterbox.rake(False)
+            )
+        # The events of the command show up in the activity feed.
+        self._coordinator.invalidate_activity(self._api_name)
+        self._coordinator.request_fast_polling()
 
 
 class PetSafeFeederButtonEntity(PetSafeButtonEntity):
@@ -105,5 +113,8 @@ class PetSafeFeederButtonEntity(PetSafeButtonEntity):
 
     async def async_press(self) -> None:
         if self._device_type == "feed":
-            await self._device.feed(1, None, False)
-        await self.coordinator.async_request_refresh()
+            await self._coordinator.async_send_command(
+                self._api_name, lambda feeder: feeder.feed(1, None, False)
+            )
+            self._coordinator.invalidate_feedings(self._api_name)
+        self._coordinator.request_fast_polling()
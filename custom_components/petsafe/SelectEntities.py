@@ -3,15 +3,15 @@ from typing import Any
 from homeassistant.components.select import SelectEntity
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 import petsafe
 
-from . import PetSafeCoordinator, PetSafeData
 from .const import DOMAIN, MANUFACTURER
+from .coordinator import PetSafeCoordinator, PetSafeData
+from .entity import PetSafeEntity
 
 
-class PetSafeSelectEntity(CoordinatorEntity, SelectEntity):
+class PetSafeSelectEntity(PetSafeEntity, SelectEntity):
     def __init__(
         self,
         hass: HomeAssistant,
@@ -24,13 +24,12 @@ class PetSafeSelectEntity(CoordinatorEntity, SelectEntity):
         device_class: str = None,
         entity_category: str = None,
     ):
-        super().__init__(coordinator)
+        super().__init__(coordinator, api_name)
         self._attr_name = name
         self._attr_device_class = device_class
         self._attr_has_entity_name = True
         self._coordinator = coordinator
         self._api_name = api_name
-        self._attr_should_poll = True
         self._attr_unique_id = api_name + "_" + device_type
         self._attr_icon = icon
         self._device_type = device_type
@@ -76,17 +75,20 @@ class PetSafeLitterboxSelectEntity(PetSafeSelectEntity):
 
     def _handle_coordinator_update(self) -> None:
         data: PetSafeData = self.coordinator.data
-        litterbox: petsafe.devices.DeviceScoopfree = next(
-            x for x in data.litterboxes if x.api_name == self._api_name
-        )
+        litterbox: petsafe.devices.DeviceScoopfree = data.litterboxes_by_api_name[
+            self._api_name
+        ]
         if self._device_type == "rake_timer":
             self._attr_current_option = str(
                 litterbox.data["shadow"]["state"]["reported"]["rakeDelayTime"]
             )
-        self.async_write_ha_state()
         return super()._handle_coordinator_update()
 
     async def async_select_option(self, option: str) -> None:
         if self._device_type == "rake_timer":
-            await self._litterbox.modify_timer(int(option), False)
-        await self._coordinator.async_request_refresh()
+            await self._coordinator.async_send_command(
+                self._api_name,
+                lambda litterbox: litterbox.modify_timer(int(option), False),
+                ("shadow", "state", "reported", "rakeDelayTime"),
+                int(option),
+            )
@@ -2,19 +2,27 @@ import datetime
 import time
 
 import pytz
-from homeassistant.components.sensor import SensorEntity
-from homeassistant.const import PERCENTAGE, SIGNAL_STRENGTH_DECIBELS_MILLIWATT
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import (
+    PERCENTAGE,
+    SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.entity import DeviceInfo, EntityCategory
+from homeassistant.helpers.event import async_call_later, async_track_time_change
+from homeassistant.util import dt as dt_util
 
 import petsafe
 
-from . import PetSafeCoordinator, PetSafeData
+from .activity import event_timestamp
 from .const import (
     CAT_IN_BOX,
     DOMAIN,
     ERROR_SENSOR_BLOCKED,
+    FEED_DONE,
     FEEDER_MODEL_GEN1,
     FEEDER_MODEL_GEN2,
     MANUFACTURER,
@@ -22,9 +30,21 @@ from .const import (
     RAKE_FINISHED,
     RAKE_NOW,
 )
+from .coordinator import PetSafeCoordinator, PetSafeData
+from .entity import PetSafeEntity
+from .metrics import PetSafeMetrics
+from .resilience import CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN, CircuitBreaker
+
+# Sensors counting the events of the current day.
+DAILY_COUNTERS = ("feedings_today", "rakes_today", "cat_visits_today")
+
 
+def _start_of_today() -> int:
+    """Return the local midnight as a timestamp in milliseconds."""
+    return int(dt_util.start_of_local_day().timestamp() * 1000)
 
-class PetSafeSensorEntity(CoordinatorEntity, SensorEntity):
+
+class PetSafeSensorEntity(PetSafeEntity, SensorEntity):
     def __init__(
         self,
         hass: HomeAssistant,
@@ -36,7 +56,7 @@ class PetSafeSensorEntity(CoordinatorEntity, SensorEntity):
         device_class: str = None,
         entity_category: str = None,
     ):
-        super().__init__(coordinator)
+        super().__init__(coordinator, api_name)
         self._attr_name = name
         self._attr_device_class = device_class
         self._attr_has_entity_name = True
@@ -52,6 +72,20 @@ class PetSafeSensorEntity(CoordinatorEntity, SensorEntity):
         elif device_class == "battery":
             self._attr_native_unit_of_measurement = PERCENTAGE
 
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        if self._device_type in DAILY_COUNTERS:
+            # Counters only change with new events, so reset them at midnight.
+            self.async_on_remove(
+                async_track_time_change(
+                    self.hass, self._handle_midnight, hour=0, minute=0, second=0
+                )
+            )
+
+    @callback
+    def _handle_midnight(self, _now) -> None:
+        self._handle_coordinator_update()
+
 
 class PetSafeLitterboxSensorEntity(PetSafeSensorEntity):
     def __init__(
@@ -85,17 +119,19 @@ class PetSafeLitterboxSensorEntity(PetSafeSensorEntity):
             model=device.product_name,
             sw_version=device.firmware,
         )
+        self._unsub_rake_timer = None
 
-        if self._device_type == "last_cleaning" or self._device_type == "rake_status":
-            self._attr_should_poll = True
-        else:
-            self._attr_should_poll = False
+    async def async_will_remove_from_hass(self) -> None:
+        if self._unsub_rake_timer is not None:
+            self._unsub_rake_timer()
+            self._unsub_rake_timer = None
+        return await super().async_will_remove_from_hass()
 
     def _handle_coordinator_update(self) -> None:
         data: PetSafeData = self.coordinator.data
-        litterbox: petsafe.devices.DeviceScoopfree = next(
-            x for x in data.litterboxes if x.api_name == self._api_name
-        )
+        litterbox: petsafe.devices.DeviceScoopfree = data.litterboxes_by_api_name[
+            self._api_name
+        ]
         if self._device_type == "rake_counter":
             self._attr_native_value = litterbox.data["shadow"]["state"]["reported"][
                 "rakeCount"
@@ -104,59 +140,65 @@ class PetSafeLitterboxSensorEntity(PetSafeSensorEntity):
             self._attr_native_value = litterbox.data["shadow"]["state"]["reported"][
                 "rssi"
             ]
-        if self._attr_should_poll:
-            self.schedule_update_ha_state(True)
-        else:
-            self.async_write_ha_state()
+        elif self._device_type == "last_cleaning":
+            activity = data.activity.get(self._api_name)
+            if activity is not None and RAKE_FINISHED in activity.latest:
+                self._attr_native_value = datetime.datetime.fromtimestamp(
+                    event_timestamp(activity.latest[RAKE_FINISHED]) / 1000,
+                    pytz.timezone("UTC"),
+                )
+        elif self._device_type == "rake_status":
+            activity = data.activity.get(self._api_name)
+            if activity is not None:
+                self._attr_native_value = self._get_rake_status(
+                    litterbox, activity.latest_status
+                )
+        elif self._device_type == "rakes_today":
+            self._attr_native_value = self.coordinator.history.device(
+                self._api_name
+            ).count(RAKE_FINISHED, _start_of_today())
+        elif self._device_type == "cat_visits_today":
+            self._attr_native_value = self.coordinator.history.device(
+                self._api_name
+            ).count(CAT_IN_BOX, _start_of_today())
         return super()._handle_coordinator_update()
 
-    async def async_update(self) -> None:
-
-        if self._device_type == "last_cleaning":
-            data: PetSafeData = self.coordinator.data
-            litterbox: petsafe.devices.DeviceScoopfree = next(
-                x for x in data.litterboxes if x.api_name == self._api_name
+    def _get_rake_status(
+        self, litterbox: petsafe.devices.DeviceScoopfree, event: dict
+    ) -> str:
+        if event is None:
+            return None
+        code = event["payload"]["code"]
+        if code == RAKE_FINISHED:
+            return "idle"
+        elif code == CAT_IN_BOX:
+            timestamp = event_timestamp(event) / 1000
+            rake_timer_in_seconds = (
+                litterbox.data["shadow"]["state"]["reported"]["rakeDelayTime"] * 60
             )
-            events = await litterbox.get_activity()
-            reversed_events = reversed(events["data"])
-            for item in reversed_events:
-                if item["payload"]["code"] == RAKE_FINISHED:
-                    self._attr_native_value = datetime.datetime.fromtimestamp(
-                        int(item["payload"]["timestamp"]) / 1000, pytz.timezone("UTC")
-                    )
-                    break
-        elif self._device_type == "rake_status":
-            data: PetSafeData = self.coordinator.data
-            litterbox: petsafe.devices.DeviceScoopfree = next(
-                x for x in data.litterboxes if x.api_name == self._api_name
-            )
-            events = await litterbox.get_activity()
-            reversed_events = reversed(events["data"])
-            status = None
-            for item in reversed_events:
-                code = item["payload"]["code"]
-                if code == RAKE_FINISHED:
-                    status = "idle"
-                    break
-                elif code == CAT_IN_BOX:
-                    status = "timing"
-                    timestamp = int(item["payload"]["timestamp"]) / 1000
-                    rake_timer_in_seconds = (
-                        litterbox.data["shadow"]["state"]["reported"]["rakeDelayTime"]
-                        * 60
-                    )
-                    if timestamp + rake_timer_in_seconds <= time.time():
-                        status = "raking"
-                    break
-                elif code == RAKE_BUTTON_DETECTED or code == RAKE_NOW:
-                    status = "raking"
-                    break
-                elif code == ERROR_SENSOR_BLOCKED:
-                    status = "jammed"
-                    break
-            self._attr_native_value = status
+            remaining = timestamp + rake_timer_in_seconds - time.time()
+            if remaining <= 0:
+                return "raking"
+            # The coordinator only notifies on changes, so switch to raking
+            # on our own once the rake timer has elapsed.
+            self._schedule_rake_timer(remaining)
+            return "timing"
+        elif code == RAKE_BUTTON_DETECTED or code == RAKE_NOW:
+            return "raking"
+        elif code == ERROR_SENSOR_BLOCKED:
+            return "jammed"
 
-        return await super().async_update()
+    def _schedule_rake_timer(self, delay: float) -> None:
+        if self._unsub_rake_timer is not None:
+            self._unsub_rake_timer()
+        self._unsub_rake_timer = async_call_later(
+            self.hass, delay, self._handle_rake_timer
+        )
+
+    @callback
+    def _handle_rake_timer(self, _now) -> None:
+        self._unsub_rake_timer = None
+        self._handle_coordinator_update()
 
 
 class PetSafeFeederSensorEntity(PetSafeSensorEntity):
@@ -193,16 +235,11 @@ class PetSafeFeederSensorEntity(PetSafeSensorEntity):
             model=device.product_name or FEEDER_MODEL_GEN1,
         )
 
-        if self._device_type == "last_feeding":
-            self._attr_should_poll = True
-        else:
-            self._attr_should_poll = False
-
     def _handle_coordinator_update(self) -> None:
         data: PetSafeData = self.coordinator.data
-        feeder: petsafe.devices.DeviceSmartFeed = next(
-            x for x in data.feeders if x.api_name == self._api_name
-        )
+        feeder: petsafe.devices.DeviceSmartFeed = data.feeders_by_api_name[
+            self._api_name
+        ]
         if self._device_type == "battery":
             self._attr_native_value = feeder.battery_level
         elif self._device_type == "food_level":
@@ -215,23 +252,107 @@ class PetSafeFeederSensorEntity(PetSafeSensorEntity):
             self._attr_native_value = status
         elif self._device_type == "signal_strength":
             self._attr_native_value = feeder.data["network_rssi"]
+        elif self._device_type == "last_feeding":
+            latest = self.coordinator.history.device(self._api_name).latest(FEED_DONE)
+            if latest is not None:
+                self._attr_native_value = datetime.datetime.fromtimestamp(
+                    latest / 1000, pytz.timezone("UTC")
+                )
+        elif self._device_type == "feedings_today":
+            self._attr_native_value = self.coordinator.history.device(
+                self._api_name
+            ).count(FEED_DONE, _start_of_today())
+        elif self._device_type == "schedules":
+            schedules = data.schedules.get(self._api_name)
+            if schedules is not None:
+                self._attr_native_value = len(schedules)
+                self._attr_extra_state_attributes = {
+                    "schedules": [
+                        {"time": key, "amount": schedules[key].get("amount")}
+                        for key in sorted(schedules)
+                    ]
+                }
+        return super()._handle_coordinator_update()
+
+
+class PetSafeCircuitBreakerSensorEntity(SensorEntity):
+    """State of the circuit breaker in front of the PetSafe cloud."""
+
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_has_entity_name = True
+    _attr_icon = "mdi:cloud-alert"
+    _attr_name = "Cloud Circuit Breaker"
+    _attr_options = [CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN]
+    _attr_should_poll = False
+
+    def __init__(self, entry: ConfigEntry, breaker: CircuitBreaker):
+        self._breaker = breaker
+        self._attr_unique_id = entry.entry_id + "_circuit_breaker"
+        self._attr_device_info = account_device_info(entry)
+
+    @property
+    def native_value(self) -> str:
+        return self._breaker.state
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        return {"consecutive_failures": self._breaker.failures}
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(
+            self._breaker.async_add_listener(self.async_write_ha_state)
+        )
+
+
+class PetSafeMetricsSensorEntity(SensorEntity):
+    """Request count or mean request latency of a PetSafe account.
 
-        if self._attr_should_poll:
-            self.schedule_update_ha_state(True)
+    The metrics change with every request, so they are polled rather than
+    pushed, and the sensors are disabled by default.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_has_entity_name = True
+    _attr_should_poll = True
+
+    def __init__(
+        self, entry: ConfigEntry, name: str, device_type: str, metrics: PetSafeMetrics
+    ):
+        self._metrics = metrics
+        self._device_type = device_type
+        self._attr_name = name
+        self._attr_unique_id = entry.entry_id + "_" + device_type
+        self._attr_device_info = account_device_info(entry)
+        if device_type == "api_latency":
+            self._attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+            self._attr_icon = "mdi:timer-outline"
         else:
-            self.async_write_ha_state()
-        return super()._handle_coordinator_update()
+            self._attr_icon = "mdi:cloud-sync"
 
     async def async_update(self) -> None:
+        requests = self._metrics.requests()
+        if self._device_type == "api_latency":
+            self._attr_native_value = round(requests.mean * 1000)
+            self._attr_extra_state_attributes = {"max": round(requests.max * 1000)}
+        else:
+            self._attr_native_value = requests.calls
+            self._attr_extra_state_attributes = {
+                "errors": requests.errors,
+                "error_rate": (
+                    round(requests.errors / requests.calls, 3)
+                    if requests.calls
+                    else 0.0
+                ),
+            }
 
-        if self._device_type == "last_feeding":
-            data: PetSafeData = self.coordinator.data
-            feeder: petsafe.devices.DeviceSmartFeed = next(
-                x for x in data.feeders if x.api_name == self._api_name
-            )
-            feeding = await feeder.get_last_feeding()
-            self._attr_native_value = datetime.datetime.fromtimestamp(
-                feeding["payload"]["time"], pytz.timezone("UTC")
-            )
 
-        return await super().async_update()
+def account_device_info(entry: ConfigEntry) -> DeviceInfo:
+    """Return the service device of a PetSafe account."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, entry.entry_id)},
+        entry_type=DeviceEntryType.SERVICE,
+        manufacturer=MANUFACTURER,
+        name=f"PetSafe {entry.title}",
+    )
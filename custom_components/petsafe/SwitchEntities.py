@@ -3,15 +3,22 @@ from typing import Any
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 import petsafe
 
-from . import PetSafeCoordinator, PetSafeData
 from .const import DOMAIN, FEEDER_MODEL_GEN1, MANUFACTURER
+from .coordinator import PetSafeCoordinator, PetSafeData
+from .entity import PetSafeEntity
 
+# The feeder setting changed by each switch.
+FEEDER_SETTINGS = {
+    "child_lock": "child_lock",
+    "feeding_paused": "paused",
+    "slow_feed": "slow_feed",
+}
 
-class PetSafeSwitchEntity(CoordinatorEntity, SwitchEntity):
+
+class PetSafeSwitchEntity(PetSafeEntity, SwitchEntity):
     def __init__(
         self,
         hass: HomeAssistant,
@@ -23,13 +30,12 @@ class PetSafeSwitchEntity(CoordinatorEntity, SwitchEntity):
         device_class: str = None,
         entity_category: str = None,
     ):
-        super().__init__(coordinator)
+        super().__init__(coordinator, api_name)
         self._attr_name = name
         self._attr_device_class = device_class
         self._attr_has_entity_name = True
         self._coordinator = coordinator
         self._api_name = api_name
-        self._attr_should_poll = True
         self._attr_unique_id = api_name + "_" + device_type
         self._attr_icon = icon
         self._device_type = device_type
@@ -71,11 +77,10 @@ class PetSafeLitterboxSwitchEntity(PetSafeSwitchEntity):
 
     def _handle_coordinator_update(self) -> None:
         data: PetSafeData = self.coordinator.data
-        litterbox: petsafe.devices.DeviceScoopfree = next(
-            x for x in data.litterboxes if x.api_name == self._api_name
-        )
+        litterbox: petsafe.devices.DeviceScoopfree = data.litterboxes_by_api_name[
+            self._api_name
+        ]
 
-        self.async_write_ha_state()
         return super()._handle_coordinator_update()
 
 
@@ -116,9 +121,9 @@ class PetSafeFeederSwitchEntity(PetSafeSwitchEntity):
 
     def _handle_coordinator_update(self) -> None:
         data: PetSafeData = self.coordinator.data
-        feeder: petsafe.devices.DeviceSmartFeed = next(
-            x for x in data.feeders if x.api_name == self._api_name
-        )
+        feeder: petsafe.devices.DeviceSmartFeed = data.feeders_by_api_name[
+            self._api_name
+        ]
         if self._device_type == "child_lock":
             self._attr_is_on = feeder.is_locked
         elif self._device_type == "feeding_paused":
@@ -126,24 +131,19 @@ class PetSafeFeederSwitchEntity(PetSafeSwitchEntity):
         elif self._device_type == "slow_feed":
             self._attr_is_on = feeder.is_slow_feed
 
-        self.schedule_update_ha_state(True)
         return super()._handle_coordinator_update()
 
-    async def async_update(self) -> None:
-        return await super().async_update()
-
     async def async_turn_on(self, **kwargs: Any) -> None:
-        if self._device_type == "child_lock":
-            await self._device.lock(True)
-        elif self._device_type == "feeding_paused":
-            await self._device.pause(True)
-        elif self._device_type == "slow_feed":
-            await self._device.slow_feed(True)
+        await self._async_set_setting(True)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
-        if self._device_type == "child_lock":
-            await self._device.lock(False)
-        elif self._device_type == "feeding_paused":
-            await self._device.pause(False)
-        elif self._device_type == "slow_feed":
-            await self._device.slow_feed(False)
+        await self._async_set_setting(False)
+
+    async def _async_set_setting(self, value: bool) -> None:
+        setting = FEEDER_SETTINGS[self._device_type]
+        await self._coordinator.async_send_command(
+            self._api_name,
+            lambda feeder: feeder.put_setting(setting, value),
+            ("settings", setting),
+            value,
+        )
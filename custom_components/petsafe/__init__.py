@@ -3,40 +3,68 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from datetime import timedelta
+import time
+from collections.abc import Callable
+from typing import Any
 
-import httpx
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     ATTR_AREA_ID,
     ATTR_DEVICE_ID,
     ATTR_ENTITY_ID,
-    CONF_ACCESS_TOKEN,
-    CONF_EMAIL,
-    CONF_TOKEN,
     Platform,
 )
-from homeassistant.core import HomeAssistant, ServiceCall
-from homeassistant.exceptions import ConfigEntryAuthFailed
-from homeassistant.helpers.httpx_client import get_async_client
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
+from homeassistant.helpers import device_registry
+from homeassistant.helpers.event import async_track_time_change
 
 import petsafe
 
 from .const import (
+    ACCOUNT_OPTIONS,
     ATTR_AMOUNT,
+    ATTR_RAKE_COUNT,
+    ATTR_RAKE_TIMER,
+    ATTR_SCHEDULES,
     ATTR_SLOW_FEED,
     ATTR_TIME,
-    CONF_REFRESH_TOKEN,
+    CONF_FEEDERS,
+    CONF_LITTERBOXES,
     DOMAIN,
+    MAX_CONCURRENT_COMMANDS,
     SERVICE_ADD_SCHEDULE,
     SERVICE_DELETE_ALL_SCHEDULES,
     SERVICE_DELETE_SCHEDULE,
     SERVICE_FEED,
     SERVICE_MODIFY_SCHEDULE,
     SERVICE_PRIME,
+    SERVICE_RAKE,
+    SERVICE_RESET_COUNTER,
+    SERVICE_SET_RAKE_TIMER,
+    SERVICE_SET_SCHEDULES,
+    STATISTICS_IMPORT_MINUTE,
 )
-from .helpers import get_feeders_for_service
+from .account import DATA_ACCOUNTS, PetSafeAccount, async_get_account
+from .coordinator import (
+    PetSafeAdaptiveCoordinator,
+    PetSafeCoordinator,
+    PetSafeFeederCoordinator,
+    PetSafeLitterboxCoordinator,
+)
+from .helpers import (
+    async_get_options_entry,
+    async_get_target_index,
+    async_remove_target_index,
+    filter_selected,
+    selected_devices,
+)
+from .history import PetSafeHistory
+from .schedules import normalize_time
+from .snapshot import PetSafeSnapshot
+from .statistics import PetSafeStatistics
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -46,156 +74,472 @@ PLATFORMS: list[Platform] = [
     Platform.BUTTON,
     Platform.SELECT,
 ]
+SERVICES = (
+    SERVICE_ADD_SCHEDULE,
+    SERVICE_DELETE_SCHEDULE,
+    SERVICE_DELETE_ALL_SCHEDULES,
+    SERVICE_MODIFY_SCHEDULE,
+    SERVICE_FEED,
+    SERVICE_PRIME,
+    SERVICE_SET_SCHEDULES,
+    SERVICE_RAKE,
+    SERVICE_RESET_COUNTER,
+    SERVICE_SET_RAKE_TIMER,
+)
+
+
+def _schedule_time(value: Any) -> str:
+    """Validate the time of a schedule, normalized like 7:00:00 to 07:00."""
+    try:
+        normalized = normalize_time(cv.string(value))
+    except ValueError as ex:
+        raise vol.Invalid(f"Invalid time: {value}") from ex
+    hours, minutes = map(int, normalized.split(":"))
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise vol.Invalid(f"Invalid time: {value}")
+    return normalized
+
+
+def _unique_times(schedules: list[dict]) -> list[dict]:
+    times = [x[ATTR_TIME] for x in schedules]
+    if len(set(times)) != len(times):
+        raise vol.Invalid("Every schedule must have a different time")
+    return schedules
+
+
+SET_SCHEDULES_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_SCHEDULES): vol.All(
+            cv.ensure_list,
+            [
+                vol.Schema(
+                    {
+                        vol.Required(ATTR_TIME): _schedule_time,
+                        vol.Required(ATTR_AMOUNT): vol.All(
+                            vol.Coerce(int), vol.Range(min=1)
+                        ),
+                    }
+                )
+            ],
+            _unique_times,
+        ),
+        **cv.TARGET_SERVICE_FIELDS,
+    }
+)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up PetSafe Integration from a config entry."""
-    client = petsafe.PetSafeClient(
-        entry.data.get(CONF_EMAIL),
-        entry.data.get(CONF_TOKEN),
-        entry.data.get(CONF_REFRESH_TOKEN),
-        entry.data.get(CONF_ACCESS_TOKEN),
-        client = get_async_client(hass)
-    )
+    setup_started = time.monotonic()
 
     hass.data.setdefault(DOMAIN, {})
 
-    coordinator = PetSafeCoordinator(hass, client, entry)
+    history = PetSafeHistory(hass, entry)
+    await history.async_load()
+    account = async_get_account(hass, entry)
+    account.async_add_entry(entry, history)
+    entry.async_on_unload(lambda: account.async_remove_entry(entry))
+    client = account.client
+    feeder_coordinator = account.feeder_coordinator
+    litterbox_coordinator = account.litterbox_coordinator
+    diagnostics_coordinator = account.diagnostics_coordinator
+
+    runtime = hass.data[DOMAIN][entry.entry_id] = PetSafeRuntimeData(
+        entry, account, history
+    )
+    entry.async_on_unload(lambda: async_remove_shared(hass, entry))
+
+    async_setup_services(hass)
+
+    # Discover the devices once, every platform then creates its entities from
+    # the coordinator data. A snapshot of the last known devices is used when
+    # available so that setup neither waits for nor depends on the cloud.
+    snapshot = PetSafeSnapshot(hass, entry)
+    if await snapshot.async_load():
+        feeder_coordinator.restore(snapshot.get_feeders(client))
+        litterbox_coordinator.restore(snapshot.get_litterboxes(client))
+        for coordinator in (feeder_coordinator, litterbox_coordinator):
+            entry.async_create_background_task(
+                hass, coordinator.async_refresh(), f"{coordinator.name} refresh"
+            )
+    else:
+        await async_first_refresh(feeder_coordinator, litterbox_coordinator)
+    await async_first_refresh(diagnostics_coordinator)
+    async_remove_unselected_devices(hass, entry)
+
+    @callback
+    def async_save_feeders() -> None:
+        if feeder_coordinator.last_update_success and feeder_coordinator.last_diff:
+            snapshot.async_save_feeders(runtime.feeders)
+
+    @callback
+    def async_save_litterboxes() -> None:
+        if (
+            litterbox_coordinator.last_update_success
+            and litterbox_coordinator.last_diff
+        ):
+            snapshot.async_save_litterboxes(runtime.litterboxes)
+
+    if snapshot.feeders is None or snapshot.litterboxes is None:
+        snapshot.async_save_feeders(runtime.feeders)
+        snapshot.async_save_litterboxes(runtime.litterboxes)
+    entry.async_on_unload(feeder_coordinator.async_add_listener(async_save_feeders))
+    entry.async_on_unload(
+        litterbox_coordinator.async_add_listener(async_save_litterboxes)
+    )
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
+    if "recorder" in hass.config.components:
+        statistics = PetSafeStatistics(hass, history)
 
-    hass.data[DOMAIN][entry.entry_id] = coordinator
+        async def async_import_statistics(_now=None) -> None:
+            await statistics.async_import(runtime.feeders, runtime.litterboxes)
+
+        entry.async_create_background_task(
+            hass, async_import_statistics(), "PetSafe statistics import"
+        )
+        entry.async_on_unload(
+            async_track_time_change(
+                hass, async_import_statistics, minute=STATISTICS_IMPORT_MINUTE, second=0
+            )
+        )
+
+    runtime.setup_duration = time.monotonic() - setup_started
+    _LOGGER.debug(
+        "Set up %d feeders and %d litterboxes in %.3f s",
+        len(runtime.feeders),
+        len(runtime.litterboxes),
+        runtime.setup_duration,
+    )
+
+    return True
+
+
+async def async_first_refresh(*coordinators: PetSafeCoordinator) -> None:
+    """Refresh the account coordinators, retrying the setup if any fails.
+
+    The coordinators are not tied to the entry being set up, so this replaces
+    their async_config_entry_first_refresh.
+    """
+    await asyncio.gather(*(x.async_refresh() for x in coordinators))
+    for coordinator in coordinators:
+        if coordinator.last_update_success:
+            continue
+        if isinstance(coordinator.last_exception, ConfigEntryAuthFailed):
+            raise coordinator.last_exception
+        raise ConfigEntryNotReady from coordinator.last_exception
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services on the first setup of a PetSafe entry.
+
+    The services reach the devices of every account, so they are registered
+    once and removed with the last entry.
+    """
+    if hass.services.has_service(DOMAIN, SERVICE_FEED):
+        return
+    targets = async_get_target_index(hass)
+
+    async def async_run_on_devices(
+        call: ServiceCall,
+        get_coordinator: Callable[[PetSafeAccount], PetSafeAdaptiveCoordinator],
+        get_devices,
+        action,
+        refresh: bool = False,
+    ) -> None:
+        """Run an action on every device targeted by a service call.
+
+        Targets are resolved once and routed to the account owning the device.
+        The actions run concurrently and the devices of each account are
+        refreshed at most once afterwards.
+        """
+        matched_devices = targets.resolve(
+            call.data.get(ATTR_AREA_ID),
+            call.data.get(ATTR_DEVICE_ID),
+            call.data.get(ATTR_ENTITY_ID),
+        )
+        accounts: dict[str, PetSafeAccount] = hass.data[DATA_ACCOUNTS]
+        results = await asyncio.gather(
+            *(
+                async_run_on_account(
+                    call,
+                    get_coordinator(x),
+                    get_devices,
+                    matched_devices,
+                    action,
+                    refresh,
+                )
+                for x in list(accounts.values())
+            ),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+
+    async def async_run_on_account(
+        call: ServiceCall,
+        coordinator: PetSafeAdaptiveCoordinator,
+        get_devices,
+        matched_devices: set[str],
+        action,
+        refresh: bool,
+    ) -> None:
+        data = coordinator.data
+        if data is None or not matched_devices & (
+            data.feeders_by_api_name.keys() | data.litterboxes_by_api_name.keys()
+        ):
+            return
+        devices = {x.api_name: x for x in await get_devices(coordinator)}
+        owned = [devices[x] for x in matched_devices if x in devices]
+        if not owned:
+            return
+        async with coordinator.metrics.async_measure(f"service {call.service}"):
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_COMMANDS)
+
+            async def run(device) -> None:
+                async with semaphore:
+                    await action(coordinator, device)
+
+            results = await asyncio.gather(
+                *(run(x) for x in owned), return_exceptions=True
+            )
+            coordinator.request_fast_polling()
+            if refresh:
+                await coordinator.async_request_refresh()
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+
+    async def async_run_on_feeders(
+        call: ServiceCall, action, refresh: bool = False
+    ) -> None:
+        await async_run_on_devices(
+            call,
+            lambda x: x.feeder_coordinator,
+            lambda x: x.get_feeders(),
+            action,
+            refresh,
+        )
+
+    async def async_run_on_litterboxes(call: ServiceCall, action) -> None:
+        await async_run_on_devices(
+            call,
+            lambda x: x.litterbox_coordinator,
+            lambda x: x.get_litterboxes(),
+            action,
+            refresh=True,
+        )
 
     async def handle_add_schedule(call: ServiceCall) -> None:
-        device_ids = call.data.get(ATTR_DEVICE_ID)
-        area_ids = call.data.get(ATTR_AREA_ID)
-        entity_ids = call.data.get(ATTR_ENTITY_ID)
         time = call.data.get(ATTR_TIME)
         amount = call.data.get(ATTR_AMOUNT)
-        matched_devices = get_feeders_for_service(
-            hass, area_ids, device_ids, entity_ids
-        )
-        for device_id in matched_devices:
-            device = next(
-                d for d in await coordinator.get_feeders() if d.api_name == device_id
-            )
-            if device is not None:
-                await device.schedule_feed(time, amount, False)
+
+        async def add_schedule(
+            coordinator: PetSafeFeederCoordinator,
+            device: petsafe.devices.DeviceSmartFeed,
+        ) -> None:
+            await coordinator.async_add_schedule(device, time, amount)
+
+        await async_run_on_feeders(call, add_schedule)
 
     hass.services.async_register(DOMAIN, SERVICE_ADD_SCHEDULE, handle_add_schedule)
 
     async def handle_delete_schedule(call: ServiceCall) -> None:
-        device_ids = call.data.get(ATTR_DEVICE_ID)
-        area_ids = call.data.get(ATTR_AREA_ID)
-        entity_ids = call.data.get(ATTR_ENTITY_ID)
         time = call.data.get(ATTR_TIME)
-        matched_devices = get_feeders_for_service(
-            hass, area_ids, device_ids, entity_ids
-        )
 
-        for device_id in matched_devices:
-            device = next(
-                d for d in await coordinator.get_feeders() if d.api_name == device_id
-            )
-            if device is not None:
-                schedules = await device.get_schedules()
-                for schedule in schedules:
-                    if schedule["time"] + ":00" == time:
-                        await device.delete_schedule(str(schedule["id"]), False)
-                        break
+        async def delete_schedule(
+            coordinator: PetSafeFeederCoordinator,
+            device: petsafe.devices.DeviceSmartFeed,
+        ) -> None:
+            await coordinator.async_delete_schedule(device, time)
+
+        await async_run_on_feeders(call, delete_schedule)
 
     hass.services.async_register(
         DOMAIN, SERVICE_DELETE_SCHEDULE, handle_delete_schedule
     )
 
     async def handle_delete_all_schedules(call: ServiceCall) -> None:
-        device_ids = call.data.get(ATTR_DEVICE_ID)
-        area_ids = call.data.get(ATTR_AREA_ID)
-        entity_ids = call.data.get(ATTR_ENTITY_ID)
-        matched_devices = get_feeders_for_service(
-            hass, area_ids, device_ids, entity_ids
-        )
+        async def delete_all_schedules(
+            coordinator: PetSafeFeederCoordinator,
+            device: petsafe.devices.DeviceSmartFeed,
+        ) -> None:
+            await coordinator.async_delete_all_schedules(device)
 
-        for device_id in matched_devices:
-            device = next(
-                d for d in await coordinator.get_feeders() if d.api_name == device_id
-            )
-            if device is not None:
-                await device.delete_all_schedules(False)
+        await async_run_on_feeders(call, delete_all_schedules)
 
     hass.services.async_register(
         DOMAIN, SERVICE_DELETE_ALL_SCHEDULES, handle_delete_all_schedules
     )
 
     async def handle_modify_schedule(call: ServiceCall) -> None:
-        device_ids = call.data.get(ATTR_DEVICE_ID)
-        area_ids = call.data.get(ATTR_AREA_ID)
-        entity_ids = call.data.get(ATTR_ENTITY_ID)
         time = call.data.get(ATTR_TIME)
         amount = call.data.get(ATTR_AMOUNT)
-        matched_devices = get_feeders_for_service(
-            hass, area_ids, device_ids, entity_ids
-        )
 
-        for device_id in matched_devices:
-            device = next(
-                d for d in await coordinator.get_feeders() if d.api_name == device_id
-            )
-            if device is not None:
-                schedules = await device.get_schedules()
-                for schedule in schedules:
-                    if schedule["time"] + ":00" == time:
-                        await device.modify_schedule(
-                            schedule["time"], amount, str(schedule["id"]), False
-                        )
-                        break
+        async def modify_schedule(
+            coordinator: PetSafeFeederCoordinator,
+            device: petsafe.devices.DeviceSmartFeed,
+        ) -> None:
+            await coordinator.async_modify_schedule(device, time, amount)
+
+        await async_run_on_feeders(call, modify_schedule)
 
     hass.services.async_register(
         DOMAIN, SERVICE_MODIFY_SCHEDULE, handle_modify_schedule
     )
 
     async def handle_feed(call: ServiceCall) -> None:
-        device_ids = call.data.get(ATTR_DEVICE_ID)
-        area_ids = call.data.get(ATTR_AREA_ID)
-        entity_ids = call.data.get(ATTR_ENTITY_ID)
         amount = call.data.get(ATTR_AMOUNT)
         slow_feed = call.data.get(ATTR_SLOW_FEED)
-        matched_devices = get_feeders_for_service(
-            hass, area_ids, device_ids, entity_ids
-        )
 
-        for device_id in matched_devices:
-            device = next(
-                d for d in await coordinator.get_feeders() if d.api_name == device_id
-            )
-            if device is not None:
-                await device.feed(amount, slow_feed, False)
-                await coordinator.async_request_refresh()
+        async def feed(
+            coordinator: PetSafeFeederCoordinator,
+            device: petsafe.devices.DeviceSmartFeed,
+        ) -> None:
+            await device.feed(amount, slow_feed, False)
+            coordinator.invalidate_feedings(device.api_name)
+
+        await async_run_on_feeders(call, feed, refresh=True)
 
     hass.services.async_register(DOMAIN, SERVICE_FEED, handle_feed)
 
     async def handle_prime(call: ServiceCall) -> None:
-        device_ids = call.data.get(ATTR_DEVICE_ID)
-        area_ids = call.data.get(ATTR_AREA_ID)
-        entity_ids = call.data.get(ATTR_ENTITY_ID)
-        matched_devices = get_feeders_for_service(
-            hass, area_ids, device_ids, entity_ids
-        )
+        async def prime(
+            coordinator: PetSafeFeederCoordinator,
+            device: petsafe.devices.DeviceSmartFeed,
+        ) -> None:
+            # NB: DeviceSmartFeed.prime() synchronously updates state after priming.
+            # Directly send a 5/8 cup meal here so that we can defer the update.
+            await device.feed(5, False, False)
+            coordinator.invalidate_feedings(device.api_name)
 
-        for device_id in matched_devices:
-            device = next(
-                d for d in await coordinator.get_feeders() if d.api_name == device_id
-            )
-            if device is not None:
-                # NB: DeviceSmartFeed.prime() synchronously updates state after priming.
-                # Directly send a 5/8 cup meal here so that we can defer the update.
-                await device.feed(5, False, False)
-                await coordinator.async_request_refresh()
+        await async_run_on_feeders(call, prime, refresh=True)
 
     hass.services.async_register(DOMAIN, SERVICE_PRIME, handle_prime)
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    await coordinator.async_config_entry_first_refresh()
+    async def handle_set_schedules(call: ServiceCall) -> None:
+        desired = {x[ATTR_TIME]: x[ATTR_AMOUNT] for x in call.data[ATTR_SCHEDULES]}
 
-    return True
+        async def set_schedules(
+            coordinator: PetSafeFeederCoordinator,
+            device: petsafe.devices.DeviceSmartFeed,
+        ) -> None:
+            await coordinator.async_set_schedules(device, desired)
+
+        await async_run_on_feeders(call, set_schedules, refresh=True)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_SET_SCHEDULES, handle_set_schedules, SET_SCHEDULES_SCHEMA
+    )
+
+    async def handle_rake(call: ServiceCall) -> None:
+        async def rake(
+            coordinator: PetSafeLitterboxCoordinator,
+            device: petsafe.devices.DeviceScoopfree,
+        ) -> None:
+            await device.rake(False)
+            coordinator.invalidate_activity(device.api_name)
+
+        await async_run_on_litterboxes(call, rake)
+
+    hass.services.async_register(DOMAIN, SERVICE_RAKE, handle_rake)
+
+    async def handle_reset_counter(call: ServiceCall) -> None:
+        rake_count = int(call.data.get(ATTR_RAKE_COUNT, 0))
+
+        async def reset_counter(
+            coordinator: PetSafeLitterboxCoordinator,
+            device: petsafe.devices.DeviceScoopfree,
+        ) -> None:
+            await device.reset(rake_count, False)
+            coordinator.invalidate_activity(device.api_name)
+
+        await async_run_on_litterboxes(call, reset_counter)
+
+    hass.services.async_register(DOMAIN, SERVICE_RESET_COUNTER, handle_reset_counter)
+
+    async def handle_set_rake_timer(call: ServiceCall) -> None:
+        rake_timer = int(call.data.get(ATTR_RAKE_TIMER))
+
+        async def set_rake_timer(
+            coordinator: PetSafeLitterboxCoordinator,
+            device: petsafe.devices.DeviceScoopfree,
+        ) -> None:
+            await device.modify_timer(rake_timer, False)
+
+        await async_run_on_litterboxes(call, set_rake_timer)
+
+    hass.services.async_register(DOMAIN, SERVICE_SET_RAKE_TIMER, handle_set_rake_timer)
+
+
+@callback
+def async_remove_shared(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove what the PetSafe entries share once the last one unloads.
+
+    Also runs when the setup of an entry fails, so the entry is forgotten here.
+    """
+    hass.data[DOMAIN].pop(entry.entry_id, None)
+    if hass.data[DOMAIN]:
+        return
+    for service in SERVICES:
+        hass.services.async_remove(DOMAIN, service)
+    async_remove_target_index(hass)
+
+
+@callback
+def async_remove_unselected_devices(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the devices deselected in the options, along with their entities."""
+    feeders = selected_devices(entry, CONF_FEEDERS)
+    litterboxes = selected_devices(entry, CONF_LITTERBOXES)
+    if feeders is None or litterboxes is None:
+        return
+    keep = feeders | litterboxes | {entry.entry_id}
+    device_reg = device_registry.async_get(hass)
+    for device in device_registry.async_entries_for_config_entry(
+        device_reg, entry.entry_id
+    ):
+        if not any(x[0] == DOMAIN and x[1] in keep for x in device.identifiers):
+            device_reg.async_update_device(
+                device.id, remove_config_entry_id=entry.entry_id
+            )
+
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change.
+
+    Entry updates which only persist refreshed tokens are ignored. When the
+    options of the account change, every entry of the account is reloaded so
+    the account is set up again with them.
+    """
+    runtime: PetSafeRuntimeData = hass.data[DOMAIN][entry.entry_id]
+    if entry.options == runtime.options:
+        return
+    account_options = {
+        key: value for key, value in entry.options.items() if key in ACCOUNT_OPTIONS
+    }
+    if (
+        async_get_options_entry(hass, entry).entry_id != entry.entry_id
+        or account_options == runtime.account.options
+    ):
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    entries = [
+        entry,
+        *(x for x in runtime.account.entries.values() if x is not entry),
+    ]
+    for x in entries:
+        await hass.config_entries.async_unload(x.entry_id)
+    for x in entries:
+        await hass.config_entries.async_setup(x.entry_id)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the device snapshot and history of a removed config entry."""
+    await PetSafeSnapshot(hass, entry).async_remove()
+    await PetSafeHistory(hass, entry).async_remove()
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -206,81 +550,35 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unload_ok
 
 
-class PetSafeData:
-    def __init__(
-        self,
-        feeders: list[petsafe.devices.DeviceSmartFeed],
-        litterboxes: list[petsafe.devices.DeviceScoopfree],
-    ):
-        self.feeders = feeders
-        self.litterboxes = litterboxes
-
-
-class PetSafeCoordinator(DataUpdateCoordinator):
-    """Data Update Coordinator for petsafe devices."""
+class PetSafeRuntimeData:
+    """The account, history, device selection and options of a config entry."""
 
     def __init__(
-        self, hass: HomeAssistant, api: petsafe.PetSafeClient, entry: ConfigEntry
+        self, entry: ConfigEntry, account: PetSafeAccount, history: PetSafeHistory
     ):
-        """Initialize my coordinator."""
-        super().__init__(
-            hass,
-            _LOGGER,
-            # Name of the data. For logging purposes.
-            name="PetSafe",
-            # Polling interval. Will only be polled if there are subscribers.
-            update_interval=timedelta(seconds=30),
+        self.account = account
+        self.history = history
+        self.client = account.client
+        self.coalescer = account.coalescer
+        self.feeder_coordinator = account.feeder_coordinator
+        self.litterbox_coordinator = account.litterbox_coordinator
+        self.diagnostics_coordinator = account.diagnostics_coordinator
+        self.connection_metrics = account.connection_metrics
+        self.setup_duration: float = None
+        self.options = dict(entry.options)
+        self._selected_feeders = selected_devices(entry, CONF_FEEDERS)
+        self._selected_litterboxes = selected_devices(entry, CONF_LITTERBOXES)
+
+    @property
+    def feeders(self) -> list[petsafe.devices.DeviceSmartFeed]:
+        """The feeders of the account selected in this entry."""
+        return filter_selected(
+            self.feeder_coordinator.data.feeders, self._selected_feeders
+        )
+
+    @property
+    def litterboxes(self) -> list[petsafe.devices.DeviceScoopfree]:
+        """The litterboxes of the account selected in this entry."""
+        return filter_selected(
+            self.litterbox_coordinator.data.litterboxes, self._selected_litterboxes
         )
-        self.api: petsafe.PetSafeClient = api
-        self.hass: HomeAssistant = hass
-        self._feeders: list[petsafe.devices.DeviceSmartFeed] = None
-        self._litterboxes: list[petsafe.devices.DeviceScoopfree] = None
-        self._device_lock = asyncio.Lock()
-        self.entry = entry
-        self._authErrorCount = 0
-
-    async def get_feeders(self) -> list[petsafe.devices.DeviceSmartFeed]:
-        """Return the list of feeders."""
-        async with self._device_lock:
-            try:
-                if self._feeders is None:
-                    self._feeders = await self.api.get_feeders()
-            except httpx.HTTPStatusError as ex:
-                if ex.response.status_code in (401, 403):
-                    await self.entry.async_start_reauth(self.hass)
-                else:
-                    raise
-            return self._feeders
-
-    async def get_litterboxes(self) -> list[petsafe.devices.DeviceScoopfree]:
-        """Return the list of litterboxes."""
-        async with self._device_lock:
-            try:
-                if self._litterboxes is None:
-                    self._litterboxes = await self.api.get_litterboxes()
-            except httpx.HTTPStatusError as ex:
-                if ex.response.status_code in (401, 403):
-                    await self.entry.async_start_reauth(self.hass)
-                else:
-                    raise
-            return self._litterboxes
-
-    async def _async_update_data(self) -> PetSafeData:
-        """Fetch data from API endpoint."""
-        try:
-            async with self._device_lock:
-                self._feeders = await self.api.get_feeders()
-                self._litterboxes = await self.api.get_litterboxes()
-                self._authErrorCount = 0
-                return PetSafeData(self._feeders, self._litterboxes)
-        except httpx.HTTPStatusError as ex:
-            if ex.response.status_code in (401, 403):
-                self._authErrorCount += 1
-                if self._authErrorCount >= 5:
-                    self._authErrorCount = 0
-                    raise ConfigEntryAuthFailed() from ex
-                
-            else:
-                raise UpdateFailed() from ex
-        except Exception as ex:
-            raise UpdateFailed() from ex
@@ -0,0 +1,214 @@
+"""PetSafe accounts shared by the config entries which use them."""
+from __future__ import annotations
+
+import contextvars
+import logging
+
+import httpx
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import (
+    CONF_ACCESS_TOKEN,
+    CONF_EMAIL,
+    CONF_TOKEN,
+    EVENT_HOMEASSISTANT_STOP,
+)
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.httpx_client import get_async_client
+
+from .auth import PetSafeAuthClient
+from .coalescer import RequestCoalescer
+from .connection import ConnectionMetrics, create_client
+from .const import (
+    ACCOUNT_OPTIONS,
+    CONF_DEDICATED_CLIENT,
+    CONF_FEEDERS,
+    CONF_LITTERBOXES,
+    CONF_REFRESH_TOKEN,
+    CONF_WRITE_RETRIES,
+    DEFAULT_DEDICATED_CLIENT,
+    DEFAULT_WRITE_RETRIES,
+    DOMAIN,
+)
+from .coordinator import (
+    PetSafeDiagnosticsCoordinator,
+    PetSafeFeederCoordinator,
+    PetSafeLitterboxCoordinator,
+)
+from .helpers import (
+    async_get_account_entries,
+    async_get_options_entry,
+    selected_devices,
+)
+from .history import PetSafeAccountHistory, PetSafeHistory
+from .metrics import PetSafeMetrics
+from .resilience import PetSafeResilience
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_ACCOUNTS = f"{DOMAIN}_accounts"
+
+
+class PetSafeAccount:
+    """The client and coordinators of a PetSafe account.
+
+    Every config entry of the same account shares them, so adding an account
+    more than once, for example to split its devices by location, still polls
+    the cloud once per cycle for the devices selected by any of the entries.
+    Settings other than the device selection are the options of the oldest
+    enabled entry of the account. The account owns the coordinators and shuts them
+    down with its last entry or when Home Assistant stops.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry):
+        self.hass = hass
+        self.key: str = entry.data[CONF_EMAIL].lower()
+        self.entries: dict[str, ConfigEntry] = {}
+        account_entries = async_get_account_entries(hass, entry)
+        self.options = {
+            key: value
+            for key, value in async_get_options_entry(hass, entry).options.items()
+            if key in ACCOUNT_OPTIONS
+        }
+
+        self.connection_metrics: ConnectionMetrics = None
+        self._http_client: httpx.AsyncClient = None
+        if self.options.get(CONF_DEDICATED_CLIENT, DEFAULT_DEDICATED_CLIENT):
+            self.connection_metrics = ConnectionMetrics()
+            self._http_client = create_client(
+                len(
+                    set().union(
+                        *(
+                            selected_devices(x, key) or ()
+                            for x in account_entries
+                            for key in (CONF_FEEDERS, CONF_LITTERBOXES)
+                        )
+                    )
+                ),
+                self.connection_metrics,
+            )
+
+        self.client = PetSafeAuthClient(
+            entry.data.get(CONF_EMAIL),
+            entry.data.get(CONF_TOKEN),
+            entry.data.get(CONF_REFRESH_TOKEN),
+            entry.data.get(CONF_ACCESS_TOKEN),
+            self._http_client or get_async_client(hass),
+            PetSafeResilience(
+                self.options.get(CONF_WRITE_RETRIES, DEFAULT_WRITE_RETRIES)
+            ),
+            PetSafeMetrics(),
+            self._async_save_tokens,
+        )
+        self.coalescer = RequestCoalescer()
+        self.history = PetSafeAccountHistory()
+
+        # Home Assistant ties a coordinator to the config entry being set up,
+        # which the coordinators outlive, so they are created outside of its
+        # context and given the entries they act for instead.
+        context = contextvars.Context()
+        self.feeder_coordinator = context.run(
+            PetSafeFeederCoordinator,
+            hass,
+            self.client,
+            self.entries,
+            self.options,
+            self.coalescer,
+            self.history,
+        )
+        self.litterbox_coordinator = context.run(
+            PetSafeLitterboxCoordinator,
+            hass,
+            self.client,
+            self.entries,
+            self.options,
+            self.coalescer,
+            self.history,
+        )
+        self.diagnostics_coordinator = context.run(
+            PetSafeDiagnosticsCoordinator,
+            hass,
+            self.client,
+            self.entries,
+            self.options,
+            self.coalescer,
+            self.feeder_coordinator,
+            self.litterbox_coordinator,
+        )
+        self._unsub_stop = hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, self._async_on_stop
+        )
+
+    @callback
+    def async_add_entry(self, entry: ConfigEntry, history: PetSafeHistory) -> None:
+        """Share the account with an entry and poll the devices it selected."""
+        self.entries[entry.entry_id] = entry
+        feeders = selected_devices(entry, CONF_FEEDERS)
+        litterboxes = selected_devices(entry, CONF_LITTERBOXES)
+        self.history.add(
+            entry.entry_id,
+            history,
+            None if feeders is None or litterboxes is None else feeders | litterboxes,
+        )
+        self._update_selection()
+
+    async def async_remove_entry(self, entry: ConfigEntry) -> None:
+        """Stop sharing the account with an entry, shutting it down after the last."""
+        self.entries.pop(entry.entry_id, None)
+        self.history.remove(entry.entry_id)
+        if self.entries:
+            self._update_selection()
+            return
+        self.hass.data[DATA_ACCOUNTS].pop(self.key, None)
+        if self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+        await self._async_shutdown()
+
+    async def _async_on_stop(self, _event: Event) -> None:
+        self._unsub_stop = None
+        await self._async_shutdown()
+
+    async def _async_shutdown(self) -> None:
+        for coordinator in (
+            self.diagnostics_coordinator,
+            self.feeder_coordinator,
+            self.litterbox_coordinator,
+        ):
+            await coordinator.async_shutdown()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+
+    def _update_selection(self) -> None:
+        for coordinator, key in (
+            (self.feeder_coordinator, CONF_FEEDERS),
+            (self.litterbox_coordinator, CONF_LITTERBOXES),
+        ):
+            selections = [selected_devices(x, key) for x in self.entries.values()]
+            coordinator.set_selected(
+                None if None in selections else set().union(*selections)
+            )
+
+    @callback
+    def _async_save_tokens(self) -> None:
+        """Persist the rotated tokens to every entry of the account."""
+        for entry in self.entries.values():
+            self.hass.config_entries.async_update_entry(
+                entry,
+                data={
+                    **entry.data,
+                    CONF_TOKEN: self.client.id_token,
+                    CONF_ACCESS_TOKEN: self.client.access_token,
+                    CONF_REFRESH_TOKEN: self.client.refresh_token,
+                },
+            )
+
+
+@callback
+def async_get_account(hass: HomeAssistant, entry: ConfigEntry) -> PetSafeAccount:
+    """Return the account of an entry, setting it up for its first entry."""
+    accounts: dict[str, PetSafeAccount] = hass.data.setdefault(DATA_ACCOUNTS, {})
+    key = entry.data[CONF_EMAIL].lower()
+    if key not in accounts:
+        _LOGGER.debug("Setting up the PetSafe account of %s", entry.title)
+        accounts[key] = PetSafeAccount(hass, entry)
+    return accounts[key]
@@ -0,0 +1,71 @@
+"""Incremental ingestion of the ScoopFree activity feed."""
+from __future__ import annotations
+
+import time
+
+from .const import (
+    CAT_IN_BOX,
+    ERROR_SENSOR_BLOCKED,
+    RAKE_BUTTON_DETECTED,
+    RAKE_FINISHED,
+    RAKE_NOW,
+)
+
+# Events after which the litterbox is timing or raking.
+BUSY_CODES = (CAT_IN_BOX, RAKE_BUTTON_DETECTED, RAKE_NOW)
+# A rake cycle not finished within this many seconds is no longer followed.
+BUSY_TIMEOUT = 3600
+
+# Events which determine the current rake status of a litterbox.
+STATUS_CODES = (
+    RAKE_FINISHED,
+    CAT_IN_BOX,
+    RAKE_BUTTON_DETECTED,
+    RAKE_NOW,
+    ERROR_SENSOR_BLOCKED,
+)
+
+
+def event_timestamp(event: dict) -> int:
+    """Return the timestamp of an activity event in milliseconds."""
+    return int(event["payload"]["timestamp"])
+
+
+class LitterboxActivity:
+    """Latest activity events of a single litterbox.
+
+    The feed returned by get_activity is ordered oldest first. Only the events
+    newer than the last one seen are processed on each ingest.
+    """
+
+    def __init__(self):
+        self.cursor: int = None
+        self.latest: dict[str, dict] = {}
+        self.latest_status: dict = None
+
+    @property
+    def busy(self) -> bool:
+        """Whether a rake cycle is pending or in progress."""
+        return (
+            self.latest_status is not None
+            and self.latest_status["payload"]["code"] in BUSY_CODES
+            and event_timestamp(self.latest_status) / 1000 + BUSY_TIMEOUT > time.time()
+        )
+
+    def ingest(self, events: dict) -> list[dict]:
+        """Process the events newer than the cursor and return them oldest first."""
+        new_events = []
+        for event in reversed(events["data"]):
+            if self.cursor is not None and event_timestamp(event) <= self.cursor:
+                break
+            new_events.append(event)
+        new_events.reverse()
+
+        for event in new_events:
+            code = event["payload"]["code"]
+            self.latest[code] = event
+            if code in STATUS_CODES:
+                self.latest_status = event
+        if new_events:
+            self.cursor = event_timestamp(new_events[-1])
+        return new_events
@@ -0,0 +1,162 @@
+"""PetSafe client which refreshes its tokens once, ahead of their expiry."""
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import httpx
+from botocore.exceptions import ClientError
+from homeassistant.exceptions import ConfigEntryAuthFailed
+
+import petsafe
+
+from .const import TOKEN_REFRESH_MARGIN
+from .metrics import PetSafeMetrics, endpoint_name
+from .resilience import PetSafeResilience
+
+
+def token_expiry(token: str) -> float:
+    """Return the expiry of a JWT as a timestamp, or 0 if it cannot be read."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return 0
+
+
+class PetSafeAuthClient(petsafe.PetSafeClient):
+    """PetSafe client which manages the lifecycle of its tokens.
+
+    The library refreshes the tokens before every request. This client reads
+    the expiry of the ID token instead and refreshes shortly before it, under
+    a lock so concurrent requests wait for a single refresh. A request rejected
+    as unauthorized is retried once with fresh tokens. on_tokens_updated is
+    called after every refresh so the rotated tokens can be persisted.
+
+    Every request goes through the retries and circuit breaker of resilience,
+    reads being the only requests treated as idempotent.
+    """
+
+    def __init__(
+        self,
+        email: str,
+        id_token: str,
+        refresh_token: str,
+        access_token: str,
+        client: httpx.AsyncClient,
+        resilience: PetSafeResilience,
+        metrics: PetSafeMetrics,
+        on_tokens_updated: Callable[[], None] = None,
+    ):
+        super().__init__(email, id_token, refresh_token, access_token, client=client)
+        self.resilience = resilience
+        self.metrics = metrics
+        self._refresh_lock = asyncio.Lock()
+        self._on_tokens_updated = on_tokens_updated
+        self._update_expiry()
+
+    def _update_expiry(self) -> None:
+        # Also read by the library, which then no longer refreshes every time.
+        # After a refresh the library stores the expiry it was given under a
+        # different name, which serves as a fallback for unreadable tokens.
+        self._token_expires_time = token_expiry(self._id_token) or getattr(
+            self, "token_expires_time", 0
+        )
+
+    async def async_ensure_tokens(self, rejected_token: str = None) -> None:
+        """Refresh the tokens if they are about to expire or were rejected."""
+        if rejected_token is None and not self._tokens_expiring():
+            return
+        async with self._refresh_lock:
+            # Another request may have refreshed the tokens in the meantime.
+            if rejected_token is not None and rejected_token != self._id_token:
+                return
+            if rejected_token is None and not self._tokens_expiring():
+                return
+            try:
+                # The library has no public way to refresh the tokens.
+                await self._PetSafeClient__refresh_tokens()
+            except ClientError as ex:
+                if ex.response["Error"]["Code"] == "NotAuthorizedException":
+                    raise ConfigEntryAuthFailed(
+                        "The PetSafe refresh token is no longer valid"
+                    ) from ex
+                raise
+            self._update_expiry()
+            if self._on_tokens_updated is not None:
+                self._on_tokens_updated()
+
+    def _tokens_expiring(self) -> bool:
+        return time.time() >= self._token_expires_time - TOKEN_REFRESH_MARGIN
+
+    async def _async_request(
+        self,
+        request: Callable[..., Awaitable[httpx.Response]],
+        idempotent: bool,
+        *args: Any,
+    ) -> httpx.Response:
+        endpoint = endpoint_name(request.__name__[4:].upper(), args[0])
+        return await self.resilience.async_call(
+            lambda: self._async_authorized_request(
+                lambda: self._async_measured_request(endpoint, request, *args)
+            ),
+            idempotent,
+        )
+
+    async def _async_measured_request(
+        self,
+        endpoint: str,
+        request: Callable[..., Awaitable[httpx.Response]],
+        *args: Any,
+    ) -> httpx.Response:
+        start = time.monotonic()
+        try:
+            response = await request(*args)
+        except BaseException:
+            self.metrics.record_request(endpoint, time.monotonic() - start, True)
+            raise
+        self.metrics.record_request(endpoint, time.monotonic() - start, False)
+        return response
+
+    async def _async_authorized_request(
+        self, request: Callable[[], Awaitable[httpx.Response]]
+    ) -> httpx.Response:
+        await self.async_ensure_tokens()
+        token = self._id_token
+        try:
+            return await request()
+        except httpx.HTTPStatusError as ex:
+            if not _is_auth_error(ex):
+                raise
+        # The token expired in flight or was revoked, so refresh and retry once.
+        await self.async_ensure_tokens(rejected_token=token)
+        try:
+            return await request()
+        except httpx.HTTPStatusError as ex:
+            if _is_auth_error(ex):
+                raise ConfigEntryAuthFailed("PetSafe rejected the new tokens") from ex
+            raise
+
+    async def api_post(self, path: str = "", data: dict = None):
+        return await self._async_request(super().api_post, False, path, data)
+
+    async def api_get(self, path: str = ""):
+        return await self._async_request(super().api_get, True, path)
+
+    async def api_put(self, path: str = "", data: dict = None):
+        return await self._async_request(super().api_put, False, path, data)
+
+    async def api_patch(self, path: str = "", data: dict = None):
+        return await self._async_request(super().api_patch, False, path, data)
+
+    async def api_delete(self, path: str = ""):
+        return await self._async_request(super().api_delete, False, path)
+
+
+def _is_auth_error(ex: httpx.HTTPStatusError) -> bool:
+    return ex.response.status_code in (401, 403)
@@ -1,21 +1,14 @@
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
 
-from . import ButtonEntities, PetSafeCoordinator
+from . import ButtonEntities, PetSafeRuntimeData
 from .const import DOMAIN
 
 
 async def async_setup_entry(hass: HomeAssistant, config: ConfigEntry, add_entities):
-    coordinator: PetSafeCoordinator = hass.data[DOMAIN][config.entry_id]
-
-    feeders = None
-    litterboxes = None
-    try:
-        feeders = await coordinator.get_feeders()
-        litterboxes = await coordinator.get_litterboxes()
-    except Exception as ex:
-        raise ConfigEntryNotReady("Failed to retrieve PetSafe devices") from ex
+    runtime: PetSafeRuntimeData = hass.data[DOMAIN][config.entry_id]
+    feeders = runtime.feeders
+    litterboxes = runtime.litterboxes
 
     entities = []
     for feeder in feeders:
@@ -25,7 +18,7 @@ async def async_setup_entry(hass: HomeAssistant, config: ConfigEntry, add_entiti
                 name="Feed",
                 device_type="feed",
                 device=feeder,
-                coordinator=coordinator,
+                coordinator=runtime.feeder_coordinator,
             )
         )
     for litterbox in litterboxes:
@@ -35,7 +28,7 @@ async def async_setup_entry(hass: HomeAssistant, config: ConfigEntry, add_entiti
                 name="Clean",
                 device_type="clean",
                 device=litterbox,
-                coordinator=coordinator,
+                coordinator=runtime.litterbox_coordinator,
             )
         )
         entities.append(
@@ -44,7 +37,7 @@ async def async_setup_entry(hass: HomeAssistant, config: ConfigEntry, add_entiti
                 name="Reset",
                 device_type="reset",
                 device=litterbox,
-                coordinator=coordinator,
+                coordinator=runtime.litterbox_coordinator,
             )
         )
     add_entities(entities)
@@ -0,0 +1,51 @@
+"""Single-flight coalescing of identical PetSafe API reads."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RequestCoalescer:
+    """Shares one in-flight request between concurrent identical reads.
+
+    A read whose key is already in flight waits for that request instead of
+    sending its own. The key is forgotten as soon as the request finishes, so
+    results are never cached beyond the request itself.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+
+    async def async_call(
+        self, key: Hashable, fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Return the result of fetch, sharing it with identical calls in flight."""
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.hits += 1
+            _LOGGER.debug(
+                "Sharing in-flight request %s (%d hits, %d misses)",
+                key,
+                self.hits,
+                self.misses,
+            )
+        else:
+            self.misses += 1
+            future = asyncio.ensure_future(fetch())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda x: self._request_done(key, x))
+        # Shielded so that one caller timing out does not cancel the others.
+        return await asyncio.shield(future)
+
+    def _request_done(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        if not future.cancelled():
+            # Retrieve the exception in case every caller gave up waiting.
+            future.exception()
@@ -14,11 +14,34 @@ from homeassistant.const import (
     CONF_EMAIL,
     CONF_TOKEN,
 )
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 
 import petsafe
 
-from .const import CONF_REFRESH_TOKEN, DOMAIN
+from .const import (
+    CONF_ACTIVITY_TTL,
+    CONF_DEDICATED_CLIENT,
+    CONF_DIAGNOSTICS_INTERVAL,
+    CONF_FEEDER_MAX_INTERVAL,
+    CONF_FEEDERS,
+    CONF_FEEDINGS_TTL,
+    CONF_LITTERBOX_MAX_INTERVAL,
+    CONF_LITTERBOXES,
+    CONF_MIN_INTERVAL,
+    CONF_REFRESH_TOKEN,
+    CONF_WRITE_RETRIES,
+    DEFAULT_ACTIVITY_TTL,
+    DEFAULT_DEDICATED_CLIENT,
+    DEFAULT_DIAGNOSTICS_INTERVAL,
+    DEFAULT_FEEDER_MAX_INTERVAL,
+    DEFAULT_FEEDINGS_TTL,
+    DEFAULT_LITTERBOX_MAX_INTERVAL,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_WRITE_RETRIES,
+    DOMAIN,
+)
+from .helpers import async_get_options_entry
 
 STEP_USER_DATA_SCHEMA = vol.Schema({vol.Required(CONF_EMAIL): str})
 STEP_CODE_DATA_SCHEMA = vol.Schema({vol.Required(CONF_CODE): str})
@@ -40,6 +63,13 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        return OptionsFlowHandler(config_entry)
+
     async def async_step_reauth(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -98,10 +128,10 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 data_schema=vol.Schema(
                     {
                         vol.Required(
-                            "feeders", default=list(self._feeders)
+                            CONF_FEEDERS, default=list(self._feeders)
                         ): cv.multi_select(self._feeders),
                         vol.Required(
-                            "litterboxes", default=list(self._litterboxes)
+                            CONF_LITTERBOXES, default=list(self._litterboxes)
                         ): cv.multi_select(self._litterboxes),
                     }
                 ),
@@ -131,3 +161,117 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             x.api_name: x.friendly_name for x in await self._client.get_litterboxes()
         }
         return True
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle PetSafe Integration options.
+
+    Only the oldest enabled entry of an account sets the options the entries
+    of the account share, the other entries only select their devices.
+    """
+
+    def __init__(self, config_entry: config_entries.ConfigEntry):
+        self._entry = config_entry
+        self._options: dict = {}
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        if user_input is not None:
+            self._options.update(user_input)
+            return await self.async_step_devices()
+        holder = async_get_options_entry(self.hass, self._entry)
+        if holder.entry_id != self._entry.entry_id:
+            self._options.update(self._entry.options)
+            return await self.async_step_devices()
+
+        options = self._entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_ACTIVITY_TTL,
+                        default=options.get(CONF_ACTIVITY_TTL, DEFAULT_ACTIVITY_TTL),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_FEEDINGS_TTL,
+                        default=options.get(CONF_FEEDINGS_TTL, DEFAULT_FEEDINGS_TTL),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_MIN_INTERVAL,
+                        default=options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5)),
+                    vol.Optional(
+                        CONF_FEEDER_MAX_INTERVAL,
+                        default=options.get(
+                            CONF_FEEDER_MAX_INTERVAL, DEFAULT_FEEDER_MAX_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5)),
+                    vol.Optional(
+                        CONF_LITTERBOX_MAX_INTERVAL,
+                        default=options.get(
+                            CONF_LITTERBOX_MAX_INTERVAL, DEFAULT_LITTERBOX_MAX_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5)),
+                    vol.Optional(
+                        CONF_DIAGNOSTICS_INTERVAL,
+                        default=options.get(
+                            CONF_DIAGNOSTICS_INTERVAL, DEFAULT_DIAGNOSTICS_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=60)),
+                    vol.Optional(
+                        CONF_WRITE_RETRIES,
+                        default=options.get(CONF_WRITE_RETRIES, DEFAULT_WRITE_RETRIES),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=5)),
+                    vol.Optional(
+                        CONF_DEDICATED_CLIENT,
+                        default=options.get(
+                            CONF_DEDICATED_CLIENT, DEFAULT_DEDICATED_CLIENT
+                        ),
+                    ): bool,
+                }
+            ),
+        )
+
+    async def async_step_devices(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        if user_input is not None:
+            self._options.update(user_input)
+            return self.async_create_entry(title="", data=self._options)
+
+        runtime = self.hass.data.get(DOMAIN, {}).get(self._entry.entry_id)
+        if runtime is None:
+            return self.async_abort(reason="not_loaded")
+        try:
+            feeders = {
+                x.api_name: x.friendly_name for x in await runtime.client.get_feeders()
+            }
+            litterboxes = {
+                x.api_name: x.friendly_name
+                for x in await runtime.client.get_litterboxes()
+            }
+        except Exception:
+            return self.async_abort(reason="cannot_connect")
+
+        def selected(key: str, devices: dict[str, str]) -> list[str]:
+            selection = self._entry.options.get(key, self._entry.data.get(key))
+            if selection is None:
+                return list(devices)
+            return [x for x in selection if x in devices]
+
+        return self.async_show_form(
+            step_id="devices",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_FEEDERS, default=selected(CONF_FEEDERS, feeders)
+                    ): cv.multi_select(feeders),
+                    vol.Required(
+                        CONF_LITTERBOXES,
+                        default=selected(CONF_LITTERBOXES, litterboxes),
+                    ): cv.multi_select(litterboxes),
+                }
+            ),
+        )
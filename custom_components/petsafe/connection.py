@@ -0,0 +1,56 @@
+"""Dedicated HTTP connection pool for the PetSafe cloud."""
+from __future__ import annotations
+
+import importlib.util
+
+import httpx
+from homeassistant.const import APPLICATION_NAME, __version__
+from homeassistant.util.ssl import client_context
+
+from .const import (
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_READ_TIMEOUT,
+    MAX_CONCURRENT_COMMANDS,
+)
+
+# HTTP/2 needs the optional h2 package, HTTP/1.1 is used without it.
+HTTP2_SUPPORTED = importlib.util.find_spec("h2") is not None
+
+
+class ConnectionMetrics:
+    """Counts the requests sent and the connections opened to send them."""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+
+    @property
+    def reused(self) -> int:
+        """Number of requests sent over an already open connection."""
+        return max(0, self.requests - self.connections)
+
+    async def async_on_request(self, request: httpx.Request) -> None:
+        self.requests += 1
+        request.extensions["trace"] = self._async_trace
+
+    async def _async_trace(self, event_name: str, info: dict) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self.connections += 1
+
+
+def create_client(device_count: int, metrics: ConnectionMetrics) -> httpx.AsyncClient:
+    """Create a client whose keep-alive pool can serve every device at once."""
+    keepalive = max(MAX_CONCURRENT_COMMANDS, device_count)
+    return httpx.AsyncClient(
+        verify=client_context(),
+        http2=HTTP2_SUPPORTED,
+        limits=httpx.Limits(
+            max_connections=2 * keepalive,
+            max_keepalive_connections=keepalive,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        headers={"User-Agent": f"{APPLICATION_NAME}/{__version__}"},
+        event_hooks={"request": [metrics.async_on_request]},
+    )
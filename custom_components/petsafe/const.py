@@ -1,21 +1,92 @@
 """Constants for the PetSafe Integration integration."""
-
 DOMAIN = "petsafe"
 CONF_REFRESH_TOKEN = "refresh_token"
 MANUFACTURER = "PetSafe"
 FEEDER_MODEL_GEN1 = "SmartFeed_1.0"
 FEEDER_MODEL_GEN2 = "SmartFeed_2.0"
 
+# Seconds before their expiry at which the tokens are refreshed.
+TOKEN_REFRESH_MARGIN = 300
+READ_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 5
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 60
+HTTP_CONNECT_TIMEOUT = 5
+HTTP_READ_TIMEOUT = 15
+HTTP_KEEPALIVE_EXPIRY = 60
+# Covers a read whose every attempt times out, plus the longest backoff
+# between the attempts, so the retries are never cut short.
+FETCH_TIMEOUT = READ_ATTEMPTS * (HTTP_CONNECT_TIMEOUT + HTTP_READ_TIMEOUT) + sum(
+    min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**x) for x in range(1, READ_ATTEMPTS)
+)
+MAX_CONCURRENT_COMMANDS = 5
+SCHEDULE_CACHE_TTL = 3600
+# Seconds before the first single device poll confirming a command, doubled
+# for each of the following attempts.
+CONFIRM_DELAY = 2
+CONFIRM_ATTEMPTS = 3
+STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 10
+HISTORY_SAVE_DELAY = 60
+# Events are kept for about 13 months.
+HISTORY_RETENTION = 400 * 86400
+# Days of feeder messages fetched when no feeding is known yet.
+FEEDING_HISTORY_DAYS = 7
+# Minute of every hour at which the previous hour is imported as statistics.
+STATISTICS_IMPORT_MINUTE = 5
+# Hours of statistics imported again on every run to add events which arrived late.
+STATISTICS_LOOKBACK_HOURS = 24
+
+CONF_ACTIVITY_TTL = "activity_ttl"
+DEFAULT_ACTIVITY_TTL = 30
+CONF_FEEDINGS_TTL = "feedings_ttl"
+DEFAULT_FEEDINGS_TTL = 30
+CONF_MIN_INTERVAL = "min_interval"
+DEFAULT_MIN_INTERVAL = 15
+CONF_FEEDER_MAX_INTERVAL = "feeder_max_interval"
+DEFAULT_FEEDER_MAX_INTERVAL = 300
+CONF_LITTERBOX_MAX_INTERVAL = "litterbox_max_interval"
+DEFAULT_LITTERBOX_MAX_INTERVAL = 300
+CONF_DIAGNOSTICS_INTERVAL = "diagnostics_interval"
+DEFAULT_DIAGNOSTICS_INTERVAL = 3600
+CONF_WRITE_RETRIES = "write_retries"
+DEFAULT_WRITE_RETRIES = 0
+CONF_DEDICATED_CLIENT = "dedicated_client"
+DEFAULT_DEDICATED_CLIENT = False
+# Options of the client and coordinators an account shares between its config
+# entries, which are taken from the oldest enabled entry of the account.
+ACCOUNT_OPTIONS = (
+    CONF_ACTIVITY_TTL,
+    CONF_FEEDINGS_TTL,
+    CONF_MIN_INTERVAL,
+    CONF_FEEDER_MAX_INTERVAL,
+    CONF_LITTERBOX_MAX_INTERVAL,
+    CONF_DIAGNOSTICS_INTERVAL,
+    CONF_WRITE_RETRIES,
+    CONF_DEDICATED_CLIENT,
+)
+# Devices selected in the config flow, overridden by the options when changed.
+CONF_FEEDERS = "feeders"
+CONF_LITTERBOXES = "litterboxes"
+
 SERVICE_ADD_SCHEDULE = "add_schedule"
 SERVICE_DELETE_SCHEDULE = "delete_schedule"
 SERVICE_DELETE_ALL_SCHEDULES = "delete_all_schedules"
 SERVICE_MODIFY_SCHEDULE = "modify_schedule"
 SERVICE_FEED = "feed"
 SERVICE_PRIME = "prime"
+SERVICE_SET_SCHEDULES = "set_schedules"
+SERVICE_RAKE = "rake"
+SERVICE_RESET_COUNTER = "reset_counter"
+SERVICE_SET_RAKE_TIMER = "set_rake_timer"
 
 ATTR_TIME = "time"
 ATTR_AMOUNT = "amount"
 ATTR_SLOW_FEED = "slow_feed"
+ATTR_SCHEDULES = "schedules"
+ATTR_RAKE_COUNT = "rake_count"
+ATTR_RAKE_TIMER = "rake_timer"
 
 RAKE_FINISHED = "RAKE_FINISHED"
 CAT_IN_BOX = "CAT_IN_BOX"
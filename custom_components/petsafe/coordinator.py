@@ -0,0 +1,923 @@
+"""Data update coordinators for the PetSafe Integration."""
+from __future__ import annotations
+
+import asyncio
+import copy
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+import petsafe
+
+from .activity import LitterboxActivity, event_timestamp
+from .coalescer import RequestCoalescer
+from .helpers import filter_selected
+from .history import PetSafeAccountHistory
+from .metrics import PetSafeMetrics
+from .const import (
+    CAT_IN_BOX,
+    CONF_ACTIVITY_TTL,
+    CONF_DIAGNOSTICS_INTERVAL,
+    CONF_FEEDER_MAX_INTERVAL,
+    CONF_FEEDINGS_TTL,
+    CONF_LITTERBOX_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
+    CONFIRM_ATTEMPTS,
+    CONFIRM_DELAY,
+    DEFAULT_ACTIVITY_TTL,
+    DEFAULT_DIAGNOSTICS_INTERVAL,
+    DEFAULT_FEEDER_MAX_INTERVAL,
+    DEFAULT_FEEDINGS_TTL,
+    DEFAULT_LITTERBOX_MAX_INTERVAL,
+    DEFAULT_MIN_INTERVAL,
+    FEED_DONE,
+    FEEDING_HISTORY_DAYS,
+    FETCH_TIMEOUT,
+    MAX_CONCURRENT_COMMANDS,
+    RAKE_FINISHED,
+    SCHEDULE_CACHE_TTL,
+)
+from .schedules import FeederSchedules, normalize_time, plan_schedule_changes
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PetSafeData:
+    def __init__(
+        self,
+        feeders: list[petsafe.devices.DeviceSmartFeed],
+        litterboxes: list[petsafe.devices.DeviceScoopfree],
+        activity: dict[str, LitterboxActivity],
+        schedules: dict[str, dict[str, dict]] = None,
+    ):
+        self.feeders = feeders
+        self.litterboxes = litterboxes
+        self.activity = activity
+        self.schedules = schedules or {}
+        self.feeders_by_api_name: dict[str, petsafe.devices.DeviceSmartFeed] = {
+            x.api_name: x for x in feeders
+        }
+        self.litterboxes_by_api_name: dict[str, petsafe.devices.DeviceScoopfree] = {
+            x.api_name: x for x in litterboxes
+        }
+
+
+class PetSafeCoordinator(DataUpdateCoordinator):
+    """Base coordinator for petsafe devices.
+
+    Only the entities whose device changed in a refresh are notified.
+
+    The coordinator belongs to the account rather than to a config entry, and
+    acts on behalf of every entry sharing the account: it starts their reauth
+    and only stops polling when all of them disabled it.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: petsafe.PetSafeClient,
+        entries: dict[str, ConfigEntry],
+        name: str,
+        update_interval: timedelta,
+        coalescer: RequestCoalescer,
+    ):
+        """Initialize my coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            # Name of the data. For logging purposes.
+            name=name,
+            # Polling interval. Will only be polled if there are subscribers.
+            update_interval=update_interval,
+        )
+        self.api: petsafe.PetSafeClient = api
+        self.hass: HomeAssistant = hass
+        self.entries = entries
+        self.coalescer = coalescer
+        self.metrics: PetSafeMetrics = api.metrics
+        self.last_diff: dict[str, dict[str, tuple[Any, Any]]] = None
+        self._notified_success = False
+
+    async def _async_fetch(self, fetch) -> Any:
+        """Call the API, failing the update on any error but invalid tokens.
+
+        Expiring tokens are refreshed by the client, so ConfigEntryAuthFailed
+        is only raised once the tokens can no longer be refreshed.
+        """
+        try:
+            return await asyncio.wait_for(fetch(), FETCH_TIMEOUT)
+        except ConfigEntryAuthFailed:
+            raise
+        except Exception as ex:
+            raise UpdateFailed() from ex
+
+    def _set_diff(
+        self,
+        data: PetSafeData,
+        other_changes: dict[str, dict[str, tuple[Any, Any]]] = None,
+    ) -> None:
+        """Diff the device payloads, adding changes from outside the payloads."""
+        self.last_diff = _diff_data(self.data, data)
+        if self.last_diff is not None:
+            for api_name, changes in (other_changes or {}).items():
+                self.last_diff.setdefault(api_name, {}).update(changes)
+        _LOGGER.debug("%s devices changed: %s", self.name, self.last_diff)
+
+    async def _async_refresh(self, *args: Any, **kwargs: Any) -> None:
+        start = time.monotonic()
+        await super()._async_refresh(*args, **kwargs)
+        self.metrics.record(
+            f"refresh {self.name}",
+            time.monotonic() - start,
+            not self.last_update_success,
+        )
+        if not self.last_update_success and isinstance(
+            self.last_exception, ConfigEntryAuthFailed
+        ):
+            for entry in self.entries.values():
+                entry.async_start_reauth(self.hass)
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        if self.entries and all(x.pref_disable_polling for x in self.entries.values()):
+            return
+        super()._schedule_refresh()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify only the entities whose device changed in the last refresh.
+
+        Every entity is notified when availability changes or no diff exists.
+        """
+        changed = None
+        if (
+            self.last_update_success
+            and self._notified_success
+            and self.last_diff is not None
+        ):
+            changed = self.last_diff.keys()
+        self._notified_success = self.last_update_success
+
+        for update_callback, context in list(self._listeners.values()):
+            if changed is None or context is None or context in changed:
+                update_callback()
+
+
+class PetSafeAdaptiveCoordinator(PetSafeCoordinator):
+    """Coordinator which polls fast while something is happening.
+
+    The interval drops to the minimum after a command or on activity, is kept
+    while devices keep changing and doubles up to the maximum while idle.
+
+    Commands sent through async_send_command show their expected state right
+    away and are confirmed by polling only the device they were sent to.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: petsafe.PetSafeClient,
+        entries: dict[str, ConfigEntry],
+        options: Mapping[str, Any],
+        name: str,
+        max_interval: timedelta,
+        coalescer: RequestCoalescer,
+    ):
+        self._min_interval = timedelta(
+            seconds=options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL)
+        )
+        self._max_interval = max(max_interval, self._min_interval)
+        super().__init__(hass, api, entries, name, self._min_interval, coalescer)
+        self._device_lock = asyncio.Lock()
+        self._fast_polling_requested = False
+        self._selected: set[str] = None
+        # Expected payload values of the commands not confirmed yet, by device
+        # api_name and payload path.
+        self._pending: dict[tuple[str, tuple[str, ...]], Any] = {}
+        self._confirm_tasks: dict[tuple[str, tuple[str, ...]], asyncio.Task] = {}
+
+    def set_selected(self, selected: set[str] | None) -> None:
+        """Poll only the selected devices, all of them for None."""
+        if selected != self._selected:
+            self._selected = selected
+            self._forget_devices()
+
+    def _forget_devices(self) -> None:
+        """Fetch the devices again the next time they are needed."""
+
+    def _select(self, devices: list) -> list:
+        """Drop the devices which are not selected in any config entry."""
+        return filter_selected(devices, self._selected)
+
+    async def async_send_command(
+        self,
+        api_name: str,
+        command: Callable[[Any], Awaitable[Any]],
+        path: tuple[str, ...] = None,
+        value: Any = None,
+    ) -> None:
+        """Send a command to a device and confirm it with a poll of that device.
+
+        With a path, the command is expected to set that value of the device
+        payload. The value is shown right away and kept over refreshes until the
+        cloud reports it, and reverted with a warning if it never does.
+        """
+        device = self._device(api_name)
+        key = (api_name, path)
+        if path is not None:
+            previous = _get_path(device.data, path)
+            self._pending[key] = value
+            _set_path(device.data, path, value)
+            self.async_update_device_listeners(api_name)
+        try:
+            await command(device)
+        except Exception:
+            if self._pending.pop(key, None) is not None:
+                _set_path(device.data, path, previous)
+                self.async_update_device_listeners(api_name)
+            raise
+        if key in self._confirm_tasks:
+            self._confirm_tasks[key].cancel()
+        self._confirm_tasks[key] = self.hass.async_create_background_task(
+            self._async_confirm(api_name, key), f"{self.name} confirm {api_name}"
+        )
+
+    async def _async_confirm(
+        self, api_name: str, key: tuple[str, tuple[str, ...]]
+    ) -> None:
+        """Poll a device until it reports the pending value of a command."""
+        payload = None
+        try:
+            for attempt in range(CONFIRM_ATTEMPTS):
+                await asyncio.sleep(CONFIRM_DELAY * 2**attempt)
+                try:
+                    payload = await asyncio.wait_for(
+                        self._fetch_device(api_name), FETCH_TIMEOUT
+                    )
+                except Exception as ex:
+                    _LOGGER.debug("Failed to poll %s: %r", api_name, ex)
+                    continue
+                if key not in self._pending or (
+                    _get_path(payload, key[1]) == self._pending[key]
+                ):
+                    self._pending.pop(key, None)
+                    self._adopt_payload(api_name, payload)
+                    return
+            if key in self._pending:
+                _LOGGER.warning(
+                    "%s did not confirm %s=%s, reverting to the reported state",
+                    api_name,
+                    "/".join(key[1]),
+                    self._pending.pop(key),
+                )
+            if payload is None:
+                await self.async_request_refresh()
+            else:
+                self._adopt_payload(api_name, payload)
+        finally:
+            if self._confirm_tasks.get(key) is asyncio.current_task():
+                del self._confirm_tasks[key]
+
+    async def _fetch_device(self, api_name: str) -> dict:
+        """Return the payload of a single device, leaving the current one as is."""
+        probe = copy.copy(self._device(api_name))
+
+        async def fetch() -> dict:
+            await probe.update_data()
+            if isinstance(probe, petsafe.devices.DeviceScoopfree):
+                # Unlike the list of litterboxes, a single one is wrapped.
+                return probe.data.get("data", probe.data)
+            return probe.data
+
+        return await self.coalescer.async_call(("update_data", api_name), fetch)
+
+    def _adopt_payload(self, api_name: str, payload: dict) -> None:
+        device = self._device(api_name)
+        if device is None:
+            return
+        device.data = payload
+        self._apply_pending([device])
+        self.async_update_device_listeners(api_name)
+
+    def _apply_pending(self, devices: list) -> None:
+        """Keep the expected values of commands the cloud did not report yet."""
+        devices_by_api_name = {x.api_name: x for x in devices}
+        for (api_name, path), value in list(self._pending.items()):
+            if api_name not in devices_by_api_name:
+                continue
+            data = devices_by_api_name[api_name].data
+            if _get_path(data, path) == value:
+                del self._pending[(api_name, path)]
+            else:
+                _set_path(data, path, value)
+
+    def _device(self, api_name: str) -> Any:
+        if api_name in self.data.feeders_by_api_name:
+            return self.data.feeders_by_api_name[api_name]
+        return self.data.litterboxes_by_api_name.get(api_name)
+
+    @callback
+    def async_update_device_listeners(self, api_name: str) -> None:
+        """Notify only the entities of a single device."""
+        for update_callback, context in list(self._listeners.values()):
+            if context == api_name:
+                update_callback()
+
+    async def async_shutdown(self) -> None:
+        for task in self._confirm_tasks.values():
+            task.cancel()
+        await super().async_shutdown()
+
+    @asynccontextmanager
+    async def _async_device_lock(self) -> AsyncIterator[None]:
+        """Hold the device lock, recording how long it took to acquire."""
+        start = time.monotonic()
+        async with self._device_lock:
+            self.metrics.record_lock_wait(self.name, time.monotonic() - start)
+            yield
+
+    def request_fast_polling(self) -> None:
+        """Poll at the minimum interval after a command was sent to a device."""
+        self._fast_polling_requested = True
+        if self.update_interval != self._min_interval:
+            self.update_interval = self._min_interval
+            if self._listeners:
+                self._schedule_refresh()
+
+    def _adapt_update_interval(self, active: bool) -> None:
+        """Poll fast while something is happening and back off while idle."""
+        if self._fast_polling_requested or active:
+            interval = self._min_interval
+        elif self.last_diff:
+            interval = self.update_interval
+        else:
+            interval = self.update_interval * 2
+        self._fast_polling_requested = False
+        self.update_interval = max(
+            self._min_interval, min(interval, self._max_interval)
+        )
+
+
+class PetSafeFeederCoordinator(PetSafeAdaptiveCoordinator):
+    """Coordinator for the state of SmartFeed feeders."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: petsafe.PetSafeClient,
+        entries: dict[str, ConfigEntry],
+        options: Mapping[str, Any],
+        coalescer: RequestCoalescer,
+        history: PetSafeAccountHistory,
+    ):
+        super().__init__(
+            hass,
+            api,
+            entries,
+            options,
+            "PetSafe feeders",
+            timedelta(
+                seconds=options.get(
+                    CONF_FEEDER_MAX_INTERVAL, DEFAULT_FEEDER_MAX_INTERVAL
+                )
+            ),
+            coalescer,
+        )
+        self._feeders: list[petsafe.devices.DeviceSmartFeed] = None
+        self._schedules: dict[str, FeederSchedules] = {}
+        self._changed_schedules: set[str] = set()
+        self.history = history
+        self._feedings_updated: dict[str, float] = {}
+        self._feedings_ttl: int = options.get(CONF_FEEDINGS_TTL, DEFAULT_FEEDINGS_TTL)
+
+    async def get_feeders(self) -> list[petsafe.devices.DeviceSmartFeed]:
+        """Return the list of feeders."""
+        async with self._async_device_lock():
+            if self._feeders is None:
+                self._feeders = self._select(
+                    await self.coalescer.async_call("get_feeders", self.api.get_feeders)
+                )
+            return self._feeders
+
+    def restore(self, feeders: list[petsafe.devices.DeviceSmartFeed]) -> None:
+        """Add feeders restored from a snapshot until the next refresh."""
+        self._feeders = _merge_devices(
+            self.data.feeders if self.data else [], self._select(feeders)
+        )
+        self.data = PetSafeData(
+            self._feeders, [], {}, self.data.schedules if self.data else None
+        )
+
+    def _forget_devices(self) -> None:
+        self._feeders = None
+
+    async def _async_update_data(self) -> PetSafeData:
+        """Fetch data from API endpoint."""
+        async with self._async_device_lock():
+            self._feeders = self._select(
+                await self._async_fetch(
+                    lambda: self.coalescer.async_call(
+                        "get_feeders", self.api.get_feeders
+                    )
+                )
+            )
+            self._apply_pending(self._feeders)
+            await self._async_update_schedules(self._feeders)
+            new_feedings = await self._async_update_feedings(self._feeders)
+            data = PetSafeData(
+                self._feeders,
+                [],
+                {},
+                {
+                    api_name: schedules.by_time
+                    for api_name, schedules in self._schedules.items()
+                    if schedules.by_time is not None
+                },
+            )
+            changes = {
+                api_name: {"schedules": (None, list(data.schedules.get(api_name, {})))}
+                for api_name in self._changed_schedules
+            }
+            for api_name in new_feedings:
+                changes.setdefault(api_name, {})["feedings"] = (
+                    None,
+                    self.history.device(api_name).latest(FEED_DONE),
+                )
+            self._set_diff(data, changes)
+            self._changed_schedules.clear()
+            self._adapt_update_interval(
+                any(
+                    "is_food_low" in changes
+                    for changes in (self.last_diff or {}).values()
+                )
+            )
+            return data
+
+    async def _async_update_schedules(
+        self, feeders: list[petsafe.devices.DeviceSmartFeed]
+    ) -> None:
+        """Reload the cached schedules of each feeder whose TTL expired."""
+        stale = [x for x in feeders if self.schedules(x.api_name).expired]
+        results = await asyncio.gather(
+            *(
+                asyncio.wait_for(
+                    self.schedules(x.api_name).async_load(self._schedules_fetch(x)),
+                    FETCH_TIMEOUT,
+                )
+                for x in stale
+            ),
+            return_exceptions=True,
+        )
+        for feeder, result in zip(stale, results):
+            if isinstance(result, Exception):
+                _LOGGER.warning(
+                    "Failed to update schedules for %s: %r",
+                    feeder.friendly_name,
+                    result,
+                )
+            else:
+                self._changed_schedules.add(feeder.api_name)
+
+    async def _async_update_feedings(
+        self, feeders: list[petsafe.devices.DeviceSmartFeed]
+    ) -> set[str]:
+        """Add the feedings of each feeder older than the TTL to the history.
+
+        Returns the api_name of each feeder that reported new feedings.
+        """
+        now = time.monotonic()
+        stale = [
+            x
+            for x in feeders
+            if x.api_name not in self._feedings_updated
+            or now - self._feedings_updated[x.api_name] >= self._feedings_ttl
+        ]
+        results = await asyncio.gather(
+            *(asyncio.wait_for(self._fetch_feedings(x), FETCH_TIMEOUT) for x in stale),
+            return_exceptions=True,
+        )
+        updated = set()
+        for feeder, result in zip(stale, results):
+            if isinstance(result, Exception):
+                _LOGGER.warning(
+                    "Failed to update feedings for %s: %r",
+                    feeder.friendly_name,
+                    result,
+                )
+                continue
+            history = self.history.device(feeder.api_name)
+            for message in result:
+                if message["message_type"] == FEED_DONE and history.add(
+                    FEED_DONE,
+                    int(message["payload"]["time"]) * 1000,
+                    message["payload"].get("amount", 1),
+                ):
+                    updated.add(feeder.api_name)
+            self._feedings_updated[feeder.api_name] = now
+        if updated:
+            self.history.async_schedule_save()
+        return updated
+
+    async def _fetch_feedings(self, feeder: petsafe.devices.DeviceSmartFeed) -> list:
+        """Fetch the feeder messages since the latest known feeding."""
+        latest = self.history.device(feeder.api_name).latest(FEED_DONE)
+        days = FEEDING_HISTORY_DAYS
+        if latest is not None:
+            days = min(days, int(time.time() - latest / 1000) // 86400 + 1)
+        return await self.coalescer.async_call(
+            ("get_messages_since", feeder.api_name, days),
+            lambda: feeder.get_messages_since(days),
+        )
+
+    def invalidate_feedings(self, api_name: str) -> None:
+        """Force the feedings of a feeder to be fetched on the next refresh."""
+        self._feedings_updated.pop(api_name, None)
+
+    def schedules(self, api_name: str) -> FeederSchedules:
+        """Return the schedule cache of a feeder."""
+        if api_name not in self._schedules:
+            self._schedules[api_name] = FeederSchedules(SCHEDULE_CACHE_TTL)
+        return self._schedules[api_name]
+
+    def _schedules_fetch(
+        self, feeder: petsafe.devices.DeviceSmartFeed
+    ) -> Callable[[], Awaitable[list[dict]]]:
+        """Return a fetch of the schedules of a feeder shared by concurrent loads."""
+        return lambda: self.coalescer.async_call(
+            ("get_schedules", feeder.api_name), feeder.get_schedules
+        )
+
+    async def async_find_schedule(
+        self, feeder: petsafe.devices.DeviceSmartFeed, time: str
+    ) -> dict:
+        """Return the schedule of a feeder at a time, reloading the cache on a miss."""
+        schedules = self.schedules(feeder.api_name)
+        key = normalize_time(time)
+        fetch = self._schedules_fetch(feeder)
+        by_time = await schedules.async_load(fetch)
+        if key not in by_time:
+            by_time = await schedules.async_load(fetch, force=True)
+        return by_time.get(key)
+
+    async def async_add_schedule(
+        self, feeder: petsafe.devices.DeviceSmartFeed, time: str, amount: int
+    ) -> None:
+        schedules = self.schedules(feeder.api_name)
+        try:
+            result = await feeder.schedule_feed(time, amount, False)
+        except Exception:
+            schedules.invalidate()
+            raise
+        if isinstance(result, dict) and "id" in result:
+            schedules.set({"id": result["id"], "time": time, "amount": amount})
+        else:
+            schedules.invalidate()
+        self._changed_schedules.add(feeder.api_name)
+
+    async def async_modify_schedule(
+        self, feeder: petsafe.devices.DeviceSmartFeed, time: str, amount: int
+    ) -> None:
+        schedule = await self.async_find_schedule(feeder, time)
+        if schedule is None:
+            return
+        schedules = self.schedules(feeder.api_name)
+        try:
+            await feeder.modify_schedule(
+                schedule["time"], amount, str(schedule["id"]), False
+            )
+        except Exception:
+            schedules.invalidate()
+            raise
+        schedules.set({**schedule, "amount": amount})
+        self._changed_schedules.add(feeder.api_name)
+
+    async def async_delete_schedule(
+        self, feeder: petsafe.devices.DeviceSmartFeed, time: str
+    ) -> None:
+        schedule = await self.async_find_schedule(feeder, time)
+        if schedule is None:
+            return
+        schedules = self.schedules(feeder.api_name)
+        try:
+            await feeder.delete_schedule(str(schedule["id"]), False)
+        except Exception:
+            schedules.invalidate()
+            raise
+        schedules.remove(time)
+        self._changed_schedules.add(feeder.api_name)
+
+    async def async_delete_all_schedules(
+        self, feeder: petsafe.devices.DeviceSmartFeed
+    ) -> None:
+        schedules = self.schedules(feeder.api_name)
+        try:
+            await feeder.delete_all_schedules(False)
+        except Exception:
+            schedules.invalidate()
+            raise
+        schedules.set_all([])
+        self._changed_schedules.add(feeder.api_name)
+
+    async def async_set_schedules(
+        self, feeder: petsafe.devices.DeviceSmartFeed, desired: dict[str, int]
+    ) -> None:
+        """Make the schedules of a feeder match the desired amount per time."""
+        schedules = self.schedules(feeder.api_name)
+        current = dict(await schedules.async_load(self._schedules_fetch(feeder)))
+        modifies, adds, deletes = plan_schedule_changes(
+            current, {normalize_time(x): amount for x, amount in desired.items()}
+        )
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_COMMANDS)
+
+        async def modify(schedule: dict, time: str, amount: int) -> None:
+            async with semaphore:
+                await feeder.modify_schedule(time, amount, str(schedule["id"]), False)
+            schedules.remove(schedule["time"])
+            schedules.set({**schedule, "time": time, "amount": amount})
+
+        async def add(time: str, amount: int) -> None:
+            async with semaphore:
+                result = await feeder.schedule_feed(time, amount, False)
+            if isinstance(result, dict) and "id" in result:
+                schedules.set({"id": result["id"], "time": time, "amount": amount})
+            else:
+                schedules.invalidate()
+
+        async def delete(schedule: dict) -> None:
+            async with semaphore:
+                await feeder.delete_schedule(str(schedule["id"]), False)
+            schedules.remove(schedule["time"])
+
+        results = await asyncio.gather(
+            *(modify(*x) for x in modifies),
+            *(add(*x) for x in adds),
+            *(delete(x) for x in deletes),
+            return_exceptions=True,
+        )
+        if modifies or adds or deletes:
+            self._changed_schedules.add(feeder.api_name)
+        for result in results:
+            if isinstance(result, Exception):
+                schedules.invalidate()
+                raise result
+
+
+class PetSafeLitterboxCoordinator(PetSafeAdaptiveCoordinator):
+    """Coordinator for the state and activity of ScoopFree litterboxes."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: petsafe.PetSafeClient,
+        entries: dict[str, ConfigEntry],
+        options: Mapping[str, Any],
+        coalescer: RequestCoalescer,
+        history: PetSafeAccountHistory,
+    ):
+        super().__init__(
+            hass,
+            api,
+            entries,
+            options,
+            "PetSafe litterboxes",
+            timedelta(
+                seconds=options.get(
+                    CONF_LITTERBOX_MAX_INTERVAL, DEFAULT_LITTERBOX_MAX_INTERVAL
+                )
+            ),
+            coalescer,
+        )
+        self._litterboxes: list[petsafe.devices.DeviceScoopfree] = None
+        self._activity: dict[str, LitterboxActivity] = {}
+        self._activity_updated: dict[str, float] = {}
+        self._activity_ttl: int = options.get(CONF_ACTIVITY_TTL, DEFAULT_ACTIVITY_TTL)
+        self.history = history
+
+    async def get_litterboxes(self) -> list[petsafe.devices.DeviceScoopfree]:
+        """Return the list of litterboxes."""
+        async with self._async_device_lock():
+            if self._litterboxes is None:
+                self._litterboxes = self._select(
+                    await self.coalescer.async_call(
+                        "get_litterboxes", self.api.get_litterboxes
+                    )
+                )
+            return self._litterboxes
+
+    def restore(self, litterboxes: list[petsafe.devices.DeviceScoopfree]) -> None:
+        """Add litterboxes restored from a snapshot until the next refresh."""
+        self._litterboxes = _merge_devices(
+            self.data.litterboxes if self.data else [], self._select(litterboxes)
+        )
+        self.data = PetSafeData([], self._litterboxes, self._activity)
+
+    def _forget_devices(self) -> None:
+        self._litterboxes = None
+
+    async def _async_update_data(self) -> PetSafeData:
+        """Fetch data from API endpoint."""
+        async with self._async_device_lock():
+            self._litterboxes = self._select(
+                await self._async_fetch(
+                    lambda: self.coalescer.async_call(
+                        "get_litterboxes", self.api.get_litterboxes
+                    )
+                )
+            )
+            self._apply_pending(self._litterboxes)
+            new_activity = await self._async_update_activity(self._litterboxes)
+            data = PetSafeData([], self._litterboxes, self._activity)
+            self._set_diff(
+                data,
+                {
+                    api_name: {"activity": cursors}
+                    for api_name, cursors in new_activity.items()
+                },
+            )
+            self._adapt_update_interval(self._has_activity(new_activity))
+            return data
+
+    def _has_activity(self, new_activity: dict[str, tuple[int, int]]) -> bool:
+        if any(x.busy for x in self._activity.values()):
+            return True
+        for api_name, (cursor, _) in new_activity.items():
+            cat_in_box = self._activity[api_name].latest.get(CAT_IN_BOX)
+            if (
+                cursor is not None
+                and cat_in_box is not None
+                and event_timestamp(cat_in_box) > cursor
+            ):
+                return True
+        return False
+
+    async def _async_update_activity(
+        self, litterboxes: list[petsafe.devices.DeviceScoopfree]
+    ) -> dict[str, tuple[int, int]]:
+        """Refresh the cached activity feed of each litterbox older than the TTL.
+
+        Returns the old and new cursor of each litterbox that reported new events.
+        """
+        now = time.monotonic()
+        stale = [
+            x
+            for x in litterboxes
+            if x.api_name not in self._activity_updated
+            or now - self._activity_updated[x.api_name] >= self._activity_ttl
+            # Follow a rake cycle on every refresh regardless of the TTL.
+            or self._activity[x.api_name].busy
+        ]
+        results = await asyncio.gather(
+            *(
+                asyncio.wait_for(
+                    self.coalescer.async_call(
+                        ("get_activity", x.api_name), x.get_activity
+                    ),
+                    FETCH_TIMEOUT,
+                )
+                for x in stale
+            ),
+            return_exceptions=True,
+        )
+        updated = {}
+        for litterbox, result in zip(stale, results):
+            if isinstance(result, Exception):
+                _LOGGER.warning(
+                    "Failed to update activity for %s: %r",
+                    litterbox.friendly_name,
+                    result,
+                )
+            else:
+                activity = self._activity.setdefault(
+                    litterbox.api_name, LitterboxActivity()
+                )
+                cursor = activity.cursor
+                new_events = activity.ingest(result)
+                if new_events:
+                    updated[litterbox.api_name] = (cursor, activity.cursor)
+                    self._add_history(litterbox.api_name, new_events)
+                self._activity_updated[litterbox.api_name] = now
+        if updated:
+            self.history.async_schedule_save()
+        return updated
+
+    def _add_history(self, api_name: str, events: list[dict]) -> None:
+        history = self.history.device(api_name)
+        for event in events:
+            code = event["payload"]["code"]
+            if code in (RAKE_FINISHED, CAT_IN_BOX):
+                history.add(code, event_timestamp(event))
+
+    def invalidate_activity(self, api_name: str) -> None:
+        """Force the activity of a litterbox to be fetched on the next refresh."""
+        self._activity_updated.pop(api_name, None)
+
+
+class PetSafeDiagnosticsCoordinator(PetSafeCoordinator):
+    """Coordinator for slow changing values such as battery and signal strength.
+
+    It does not call the API, it takes a snapshot of the devices last fetched
+    by the feeder and litterbox coordinators at a much lower rate.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: petsafe.PetSafeClient,
+        entries: dict[str, ConfigEntry],
+        options: Mapping[str, Any],
+        coalescer: RequestCoalescer,
+        feeder_coordinator: PetSafeFeederCoordinator,
+        litterbox_coordinator: PetSafeLitterboxCoordinator,
+    ):
+        super().__init__(
+            hass,
+            api,
+            entries,
+            "PetSafe diagnostics",
+            timedelta(
+                seconds=options.get(
+                    CONF_DIAGNOSTICS_INTERVAL, DEFAULT_DIAGNOSTICS_INTERVAL
+                )
+            ),
+            coalescer,
+        )
+        self._feeder_coordinator = feeder_coordinator
+        self._litterbox_coordinator = litterbox_coordinator
+
+    async def _async_update_data(self) -> PetSafeData:
+        """Take a snapshot of the feeder and litterbox coordinators."""
+        feeders: PetSafeData = self._feeder_coordinator.data
+        litterboxes: PetSafeData = self._litterbox_coordinator.data
+        if feeders is None or litterboxes is None:
+            raise UpdateFailed("No PetSafe devices have been fetched yet")
+        data = PetSafeData(feeders.feeders, litterboxes.litterboxes, {})
+        self._set_diff(data)
+        return data
+
+
+def _get_path(data: dict, path: tuple[str, ...]) -> Any:
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def _set_path(data: dict, path: tuple[str, ...], value: Any) -> None:
+    for key in path[:-1]:
+        data = data.setdefault(key, {})
+    data[path[-1]] = value
+
+
+def _merge_devices(devices: list, restored: list) -> list:
+    """Add the restored devices which are not known yet."""
+    known = {x.api_name for x in devices}
+    return [*devices, *(x for x in restored if x.api_name not in known)]
+
+
+def _diff_data(
+    old: PetSafeData, new: PetSafeData
+) -> dict[str, dict[str, tuple[Any, Any]]]:
+    """Return the changed fields of each device keyed by api_name."""
+    if old is None:
+        return None
+
+    changes = {}
+    for old_devices, new_devices in (
+        (old.feeders_by_api_name, new.feeders_by_api_name),
+        (old.litterboxes_by_api_name, new.litterboxes_by_api_name),
+    ):
+        for api_name in old_devices.keys() | new_devices.keys():
+            old_device = old_devices.get(api_name)
+            new_device = new_devices.get(api_name)
+            device_changes = _diff_payload(
+                old_device.data if old_device is not None else None,
+                new_device.data if new_device is not None else None,
+            )
+            if device_changes:
+                changes[api_name] = device_changes
+    return changes
+
+
+def _diff_payload(old: Any, new: Any, path: str = "") -> dict[str, tuple[Any, Any]]:
+    """Return the dotted paths of the values which differ between two payloads."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = {}
+        for key in old.keys() | new.keys():
+            changes.update(
+                _diff_payload(
+                    old.get(key), new.get(key), f"{path}.{key}" if path else key
+                )
+            )
+        return changes
+    if old != new:
+        return {path: (old, new)}
+    return {}
@@ -0,0 +1,70 @@
+"""Diagnostics support for the PetSafe Integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_ACCESS_TOKEN, CONF_EMAIL, CONF_TOKEN
+from homeassistant.core import HomeAssistant
+
+from . import PetSafeRuntimeData
+from .const import CONF_REFRESH_TOKEN, DOMAIN
+from .coordinator import PetSafeCoordinator
+
+TO_REDACT = {CONF_ACCESS_TOKEN, CONF_EMAIL, CONF_REFRESH_TOKEN, CONF_TOKEN}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    runtime: PetSafeRuntimeData = hass.data[DOMAIN][entry.entry_id]
+    breaker = runtime.client.resilience.breaker
+    connection_metrics = runtime.connection_metrics
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "setup_duration": runtime.setup_duration,
+        "account_entries": len(runtime.account.entries),
+        "coordinators": {
+            x.name: _coordinator_diagnostics(x)
+            for x in (
+                runtime.feeder_coordinator,
+                runtime.litterbox_coordinator,
+                runtime.diagnostics_coordinator,
+            )
+        },
+        "coalescer": {
+            "hits": runtime.coalescer.hits,
+            "misses": runtime.coalescer.misses,
+        },
+        "circuit_breaker": {
+            "state": breaker.state,
+            "consecutive_failures": breaker.failures,
+        },
+        "connections": (
+            None
+            if connection_metrics is None
+            else {
+                "requests": connection_metrics.requests,
+                "connections": connection_metrics.connections,
+                "reused": connection_metrics.reused,
+            }
+        ),
+        "metrics": runtime.client.metrics.as_dict(),
+    }
+
+
+def _coordinator_diagnostics(coordinator: PetSafeCoordinator) -> dict[str, Any]:
+    return {
+        "last_update_success": coordinator.last_update_success,
+        "update_interval": coordinator.update_interval.total_seconds(),
+        "devices": (
+            0
+            if coordinator.data is None
+            else len(coordinator.data.feeders) + len(coordinator.data.litterboxes)
+        ),
+    }
@@ -0,0 +1,32 @@
+"""Base entity for the PetSafe Integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+
+class PetSafeEntity(CoordinatorEntity):
+    """Coordinator entity which only writes its state when it changes.
+
+    The coordinator context is the device api_name, so the coordinator only
+    notifies the entity when that device changed.
+    """
+
+    _last_written_state: tuple[Any, ...] = None
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        if self.coordinator.data is not None:
+            self._handle_coordinator_update()
+
+    def _handle_coordinator_update(self) -> None:
+        self._async_write_state_if_changed()
+
+    def _async_write_state_if_changed(self) -> None:
+        state = (self.available, self.state, self.extra_state_attributes)
+        written = state != self._last_written_state
+        if written:
+            self._last_written_state = state
+            self.async_write_ha_state()
+        self.coordinator.metrics.record_entity_write(self.entity_id, written)
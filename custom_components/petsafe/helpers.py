@@ -1,110 +1,183 @@
-from homeassistant.config_entries import ConfigEntryState
-from homeassistant.core import HomeAssistant
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_EMAIL
+from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.helpers import device_registry, entity_registry
-from homeassistant.helpers.device_registry import DeviceEntry, DeviceRegistry
-
-from .const import DOMAIN, FEEDER_MODEL_GEN1, FEEDER_MODEL_GEN2
-
-
-def get_feeders_for_service(hass: HomeAssistant, area_ids, device_ids, entity_ids):
-    matched_devices = []
-
-    if area_ids is not None:
-        matched_devices = get_feeders_by_area_id(
-            hass,
-            device_registry.async_get(hass),
-            entity_registry.async_get(hass),
-            area_ids,
-            matched_devices,
-        )
-    if device_ids is not None:
-        matched_devices = get_feeders_by_device_id(
-            hass, device_registry.async_get(hass), device_ids, matched_devices
-        )
-
-    if entity_ids is not None:
-        matched_devices = get_feeders_by_entity_id(
-            hass,
-            device_registry.async_get(hass),
-            entity_registry.async_get(hass),
-            entity_ids,
-            matched_devices,
-        )
-    return matched_devices
-
-
-def get_feeders_by_area_id(
-    hass: HomeAssistant,
-    device_reg: DeviceRegistry,
-    entity_reg: entity_registry.EntityRegistry,
-    area_ids,
-    matched_devices=[],
-):
-    for area_id in area_ids:
-        devices = device_registry.async_entries_for_area(device_reg, area_id)
-        device_ids = []
-        [device_ids.append(x.id) for x in devices if x.id not in device_ids]
-        entities = entity_registry.async_entries_for_area(entity_reg, area_id)
-        entity_ids = []
-        [entity_ids.append(x.id) for x in entities if x.id not in entity_ids]
-
-        devices_from_registry = get_feeders_by_device_id(hass, device_reg, device_ids)
-
-        [
-            matched_devices.append(x)
-            for x in devices_from_registry
-            if x not in matched_devices
+from homeassistant.helpers.device_registry import DeviceEntry
+
+from .const import DOMAIN
+
+DATA_TARGETS = f"{DOMAIN}_targets"
+
+
+class DeviceTargetIndex:
+    """Maps the area, device and entity ids of service targets to devices.
+
+    The index covers the feeders and litterboxes of every PetSafe config
+    entry, so a service reaches the devices of every entry sharing an account.
+    It is built once from the registries and then kept up to date from their
+    update events, so resolving a service target is a set lookup per id. A
+    single index is shared by the integration, see async_get_target_index.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        self._unsubscribe: list[Callable[[], None]] = []
+        self._device_api_names: dict[str, str] = {}
+        self._device_areas: dict[str, str] = {}
+        self._area_devices: dict[str, set[str]] = {}
+        self._entity_devices: dict[str, str] = {}
+
+    @callback
+    def async_setup(self) -> None:
+        """Build the index and follow the registries until async_shutdown."""
+        device_reg = device_registry.async_get(self._hass)
+        entity_reg = entity_registry.async_get(self._hass)
+        for entry in self._hass.config_entries.async_entries(DOMAIN):
+            for device in device_registry.async_entries_for_config_entry(
+                device_reg, entry.entry_id
+            ):
+                self._add_device(device)
+            for entity in entity_registry.async_entries_for_config_entry(
+                entity_reg, entry.entry_id
+            ):
+                if entity.device_id is not None:
+                    self._entity_devices[entity.entity_id] = entity.device_id
+
+        self._unsubscribe = [
+            self._hass.bus.async_listen(
+                device_registry.EVENT_DEVICE_REGISTRY_UPDATED,
+                self._async_device_updated,
+            ),
+            self._hass.bus.async_listen(
+                entity_registry.EVENT_ENTITY_REGISTRY_UPDATED,
+                self._async_entity_updated,
+            ),
         ]
 
-    return matched_devices
-
-
-def get_feeders_by_device_id(
-    hass: HomeAssistant, device_reg: DeviceRegistry, device_ids, matched_devices=[]
-):
-    for device_id in device_ids:
-        device_entry = device_reg.async_get(device_id)
-
-        if is_device_feeder(hass, device_entry):
-            api_name = next(iter(device_entry.identifiers))[1]
-            if not api_name in matched_devices:
-                matched_devices.append(api_name)
-    return matched_devices
-
-
-def get_feeders_by_entity_id(
-    hass: HomeAssistant,
-    device_reg: DeviceRegistry,
-    entity_reg: entity_registry.EntityRegistry,
-    entity_ids,
-    matched_devices=[],
-):
-    for entity_id in entity_ids:
-        entity = entity_reg.async_get(entity_id)
-        [
-            matched_devices.append(x)
-            for x in get_feeders_by_device_id(hass, device_reg, [entity.device_id])
-            if x not in matched_devices
-        ]
-    return matched_devices
+    @callback
+    def async_shutdown(self) -> None:
+        """Stop following the registries."""
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe = []
+
+    def resolve(self, area_ids, device_ids, entity_ids) -> set[str]:
+        """Return the api_name of every device targeted by a service call."""
+        matched_devices: set[str] = set()
+        for area_id in _as_list(area_ids):
+            matched_devices.update(self._area_devices.get(area_id, ()))
+        matched_devices.update(_as_list(device_ids))
+        for entity_id in _as_list(entity_ids):
+            if entity_id in self._entity_devices:
+                matched_devices.add(self._entity_devices[entity_id])
+        return {
+            self._device_api_names[x]
+            for x in matched_devices
+            if x in self._device_api_names
+        }
+
+    @callback
+    def _async_device_updated(self, event: Event) -> None:
+        device_id = event.data["device_id"]
+        self._remove_device(device_id)
+        if event.data["action"] != "remove":
+            device = device_registry.async_get(self._hass).async_get(device_id)
+            if device is not None:
+                self._add_device(device)
+
+    @callback
+    def _async_entity_updated(self, event: Event) -> None:
+        self._entity_devices.pop(event.data.get("old_entity_id"), None)
+        self._entity_devices.pop(event.data["entity_id"], None)
+        if event.data["action"] != "remove":
+            entity = entity_registry.async_get(self._hass).async_get(
+                event.data["entity_id"]
+            )
+            if (
+                entity is not None
+                and entity.platform == DOMAIN
+                and entity.device_id is not None
+            ):
+                self._entity_devices[entity.entity_id] = entity.device_id
+
+    def _add_device(self, device: DeviceEntry) -> None:
+        api_name = next((x[1] for x in device.identifiers if x[0] == DOMAIN), None)
+        if api_name is None:
+            return
+        self._device_api_names[device.id] = api_name
+        if device.area_id is not None:
+            self._device_areas[device.id] = device.area_id
+            self._area_devices.setdefault(device.area_id, set()).add(device.id)
+
+    def _remove_device(self, device_id: str) -> None:
+        self._device_api_names.pop(device_id, None)
+        area_id = self._device_areas.pop(device_id, None)
+        if area_id is not None:
+            self._area_devices[area_id].discard(device_id)
+
+
+@callback
+def async_get_target_index(hass: HomeAssistant) -> DeviceTargetIndex:
+    """Return the target index of the integration, building it on first use."""
+    if DATA_TARGETS not in hass.data:
+        hass.data[DATA_TARGETS] = DeviceTargetIndex(hass)
+        hass.data[DATA_TARGETS].async_setup()
+    return hass.data[DATA_TARGETS]
+
+
+@callback
+def async_remove_target_index(hass: HomeAssistant) -> None:
+    """Stop and drop the target index of the integration."""
+    if (targets := hass.data.pop(DATA_TARGETS, None)) is not None:
+        targets.async_shutdown()
+
+
+def selected_devices(entry: ConfigEntry, key: str) -> set[str] | None:
+    """Return the api_names selected for a device type, None if all are."""
+    selection = entry.options.get(key, entry.data.get(key))
+    return None if selection is None else set(selection)
+
+
+@callback
+def async_get_account_entries(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> list[ConfigEntry]:
+    """Return the config entries of the account of an entry, oldest first."""
+    key = entry.data[CONF_EMAIL].lower()
+    return [
+        x
+        for x in hass.config_entries.async_entries(DOMAIN)
+        if x.data[CONF_EMAIL].lower() == key
+    ]
+
+
+@callback
+def async_get_options_entry(hass: HomeAssistant, entry: ConfigEntry) -> ConfigEntry:
+    """Return the entry holding the options of the account of an entry.
+
+    That is the oldest entry of the account which is not disabled, so the
+    options of a disabled entry never apply.
+    """
+    return next(
+        (x for x in async_get_account_entries(hass, entry) if x.disabled_by is None),
+        entry,
+    )
 
 
-def is_device_feeder(hass: HomeAssistant, device: DeviceEntry):
-    if device.model not in [FEEDER_MODEL_GEN1, FEEDER_MODEL_GEN2]:
-        return False
+def filter_selected(devices: list, selected: set[str] | None) -> list:
+    """Return the devices whose api_name is selected, all of them for None."""
+    if selected is None:
+        return devices
+    return [x for x in devices if x.api_name in selected]
 
-    config_entry_ids = device.config_entries
-    entry = next(
-        (
-            entry
-            for entry in hass.config_entries.async_entries(DOMAIN)
-            if entry.entry_id in config_entry_ids
-        ),
-        None,
-    )
-    if entry and entry.state != ConfigEntryState.LOADED:
-        return False
-    if entry is None or entry.entry_id not in hass.data[DOMAIN]:
-        return False
 
-    return True
+def _as_list(ids) -> Iterable[str]:
+    if ids is None:
+        return ()
+    if isinstance(ids, str):
+        return (ids,)
+    return ids
@@ -0,0 +1,157 @@
+"""Local history of feeding and cleaning events."""
+from __future__ import annotations
+
+import time
+from bisect import bisect_left, bisect_right
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, HISTORY_RETENTION, HISTORY_SAVE_DELAY, STORAGE_VERSION
+
+
+class DeviceHistory:
+    """Events of a single device indexed by code and time.
+
+    The timestamps in milliseconds of each code are kept sorted next to the
+    value of each event, such as the amount fed, so range queries are binary
+    searches however long the history is. An event is identified by its code
+    and timestamp, adding it again has no effect.
+    """
+
+    def __init__(self):
+        self._timestamps: dict[str, list[int]] = {}
+        self._values: dict[str, list[int]] = {}
+
+    def add(self, code: str, timestamp: int, value: int = 1) -> bool:
+        """Add an event and return whether it was new."""
+        timestamps = self._timestamps.setdefault(code, [])
+        values = self._values.setdefault(code, [])
+        # Events mostly arrive in order, which makes this an append.
+        index = bisect_left(timestamps, timestamp)
+        if index < len(timestamps) and timestamps[index] == timestamp:
+            return False
+        timestamps.insert(index, timestamp)
+        values.insert(index, value)
+        return True
+
+    def latest(self, code: str) -> int:
+        """Return the timestamp of the latest event with a code."""
+        timestamps = self._timestamps.get(code)
+        return timestamps[-1] if timestamps else None
+
+    def count(self, code: str, start: int, end: int = None) -> int:
+        """Return the number of events with a code from start until end."""
+        first, last = self._range(code, start, end)
+        return last - first
+
+    def total(self, code: str, start: int, end: int = None) -> int:
+        """Return the sum of the values of the events from start until end."""
+        first, last = self._range(code, start, end)
+        return sum(self._values.get(code, [])[first:last])
+
+    def events(self, code: str, start: int, end: int = None) -> list[tuple[int, int]]:
+        """Return the timestamp and value of the events from start until end."""
+        first, last = self._range(code, start, end)
+        return list(
+            zip(
+                self._timestamps.get(code, [])[first:last],
+                self._values.get(code, [])[first:last],
+            )
+        )
+
+    def prune(self, before: int) -> None:
+        """Forget the events older than a timestamp."""
+        for code, timestamps in self._timestamps.items():
+            index = bisect_left(timestamps, before)
+            if index:
+                del timestamps[:index]
+                del self._values[code][:index]
+
+    def _range(self, code: str, start: int, end: int = None) -> tuple[int, int]:
+        timestamps = self._timestamps.get(code, [])
+        first = bisect_left(timestamps, start)
+        last = len(timestamps) if end is None else bisect_right(timestamps, end)
+        return first, max(first, last)
+
+    def as_dict(self) -> dict:
+        return {
+            code: [self._timestamps[code], self._values[code]]
+            for code in self._timestamps
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> DeviceHistory:
+        history = cls()
+        for code, (timestamps, values) in data.items():
+            history._timestamps[code] = list(timestamps)
+            history._values[code] = list(values)
+        return history
+
+
+class PetSafeHistory:
+    """Event history of every device of a config entry persisted to storage.
+
+    Events older than the retention are pruned whenever the history is saved.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry):
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.history")
+        self._devices: dict[str, DeviceHistory] = {}
+
+    async def async_load(self) -> None:
+        data = await self._store.async_load()
+        if data is not None:
+            self._devices = {
+                api_name: DeviceHistory.from_dict(x) for api_name, x in data.items()
+            }
+
+    def device(self, api_name: str) -> DeviceHistory:
+        """Return the history of a device."""
+        if api_name not in self._devices:
+            self._devices[api_name] = DeviceHistory()
+        return self._devices[api_name]
+
+    @callback
+    def async_schedule_save(self) -> None:
+        self._store.async_delay_save(self._data_to_save, HISTORY_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
+
+    def _data_to_save(self) -> dict:
+        before = int((time.time() - HISTORY_RETENTION) * 1000)
+        for history in self._devices.values():
+            history.prune(before)
+        return {api_name: x.as_dict() for api_name, x in self._devices.items()}
+
+
+class PetSafeAccountHistory:
+    """History of every config entry sharing an account.
+
+    The events of a device go to the history of the first entry which selected
+    it, so each entry keeps persisting the devices it shows.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, tuple[PetSafeHistory, set[str] | None]] = {}
+
+    def add(self, entry_id: str, history: PetSafeHistory, selected: set[str]) -> None:
+        """Route the devices selected in an entry, None for all, to its history."""
+        self._entries[entry_id] = (history, selected)
+
+    def remove(self, entry_id: str) -> None:
+        self._entries.pop(entry_id, None)
+
+    def device(self, api_name: str) -> DeviceHistory:
+        """Return the history of a device, not persisted if no entry selected it."""
+        for history, selected in self._entries.values():
+            if selected is None or api_name in selected:
+                return history.device(api_name)
+        return DeviceHistory()
+
+    @callback
+    def async_schedule_save(self) -> None:
+        for history, _ in self._entries.values():
+            history.async_schedule_save()
@@ -0,0 +1,124 @@
+"""In-memory performance counters of the PetSafe Integration."""
+from __future__ import annotations
+
+import re
+import time
+from bisect import bisect_left
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+# Upper bounds in seconds of the latency histogram buckets, the last bucket
+# holds everything slower.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_ID_SEGMENT = re.compile(r"[^/]*\d[^/]*")
+
+
+def endpoint_name(method: str, path: str) -> str:
+    """Return a request as METHOD path, without query and device ids."""
+    return f"{method} {_ID_SEGMENT.sub('{id}', path.split('?')[0])}"
+
+
+class LatencyStats:
+    """Call count, error count and latency histogram of one operation."""
+
+    __slots__ = ("calls", "errors", "total", "max", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def record(self, duration: float, error: bool = False) -> None:
+        self.calls += 1
+        self.errors += error
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.buckets[bisect_left(LATENCY_BUCKETS, duration)] += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.calls if self.calls else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": self.errors / self.calls if self.calls else 0.0,
+            "mean": self.mean,
+            "max": self.max,
+            "histogram": {
+                f"<={bound}": count
+                for bound, count in zip(LATENCY_BUCKETS, self.buckets)
+            }
+            | {f">{LATENCY_BUCKETS[-1]}": self.buckets[-1]},
+        }
+
+
+class PetSafeMetrics:
+    """Performance counters of a PetSafe account.
+
+    The client, coordinators and entities of every config entry sharing the
+    account record into the same counters. Recording is a few additions per
+    call, so the counters are always on. Requests are grouped by endpoint,
+    other operations such as coordinator refreshes and services by name.
+    """
+
+    def __init__(self):
+        self.endpoints: dict[str, LatencyStats] = {}
+        self.operations: dict[str, LatencyStats] = {}
+        self.lock_waits: dict[str, LatencyStats] = {}
+        self.entity_writes: dict[str, int] = {}
+        self.entity_writes_skipped: dict[str, int] = {}
+
+    def record_request(self, endpoint: str, duration: float, error: bool) -> None:
+        if endpoint not in self.endpoints:
+            self.endpoints[endpoint] = LatencyStats()
+        self.endpoints[endpoint].record(duration, error)
+
+    def record(self, operation: str, duration: float, error: bool = False) -> None:
+        if operation not in self.operations:
+            self.operations[operation] = LatencyStats()
+        self.operations[operation].record(duration, error)
+
+    def record_lock_wait(self, lock: str, duration: float) -> None:
+        if lock not in self.lock_waits:
+            self.lock_waits[lock] = LatencyStats()
+        self.lock_waits[lock].record(duration)
+
+    def record_entity_write(self, entity_id: str, written: bool) -> None:
+        counts = self.entity_writes if written else self.entity_writes_skipped
+        counts[entity_id] = counts.get(entity_id, 0) + 1
+
+    @asynccontextmanager
+    async def async_measure(self, operation: str) -> AsyncIterator[None]:
+        """Record the duration of the block, as an error if it raised."""
+        start = time.monotonic()
+        try:
+            yield
+        except BaseException:
+            self.record(operation, time.monotonic() - start, True)
+            raise
+        self.record(operation, time.monotonic() - start)
+
+    def requests(self) -> LatencyStats:
+        """Return the stats of the requests to every endpoint together."""
+        total = LatencyStats()
+        for stats in self.endpoints.values():
+            total.calls += stats.calls
+            total.errors += stats.errors
+            total.total += stats.total
+            total.max = max(total.max, stats.max)
+            total.buckets = [a + b for a, b in zip(total.buckets, stats.buckets)]
+        return total
+
+    def as_dict(self) -> dict:
+        return {
+            "endpoints": {k: v.as_dict() for k, v in sorted(self.endpoints.items())},
+            "operations": {k: v.as_dict() for k, v in sorted(self.operations.items())},
+            "lock_waits": {k: v.as_dict() for k, v in sorted(self.lock_waits.items())},
+            "entity_writes": dict(sorted(self.entity_writes.items())),
+            "entity_writes_skipped": dict(sorted(self.entity_writes_skipped.items())),
+        }
@@ -0,0 +1,141 @@
+"""Retries and circuit breaking for calls to the PetSafe cloud."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import httpx
+
+from .const import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    READ_ATTEMPTS,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the cloud while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Stops calling the PetSafe cloud while it keeps failing.
+
+    The circuit opens after a number of consecutive transient failures. Once
+    the reset timeout passed it is half open and lets a single trial call
+    through, which decides whether it closes again or stays open for another
+    timeout. Other calls fail while the trial is in flight.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._opened: float = None
+        self._trial_in_flight = False
+        self._listeners: list[Callable[[], None]] = []
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError if calls are not allowed."""
+        if self.state == CIRCUIT_OPEN:
+            if time.monotonic() - self._opened < self._reset_timeout:
+                raise CircuitOpenError("The PetSafe cloud is unavailable")
+            self._set_state(CIRCUIT_HALF_OPEN)
+        elif self.state == CIRCUIT_HALF_OPEN and self._trial_in_flight:
+            raise CircuitOpenError("The PetSafe cloud is being probed")
+        if self.state == CIRCUIT_HALF_OPEN:
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._trial_in_flight = False
+        self._set_state(CIRCUIT_CLOSED)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == CIRCUIT_HALF_OPEN or self.failures >= self._failure_threshold:
+            self._opened = time.monotonic()
+            self._set_state(CIRCUIT_OPEN)
+
+    def record_aborted(self) -> None:
+        """Record a call which ended without telling whether the cloud is up."""
+        self._trial_in_flight = False
+
+    def async_add_listener(self, update_callback: Callable[[], None]) -> Callable:
+        """Call update_callback whenever the state changes."""
+        self._listeners.append(update_callback)
+        return lambda: self._listeners.remove(update_callback)
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            _LOGGER.info("PetSafe circuit breaker is now %s", state)
+            self.state = state
+            for update_callback in list(self._listeners):
+                update_callback()
+
+
+class PetSafeResilience:
+    """Retries transient failures with jittered exponential backoff.
+
+    Reads are retried up to READ_ATTEMPTS times. Writes, such as a feed or a
+    rake, are only retried as configured since a request which timed out may
+    still have been executed. Requests which never reached the cloud are safe
+    to send again and are retried like reads.
+    """
+
+    def __init__(self, write_retries: int):
+        self.breaker = CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT)
+        self._write_attempts = 1 + write_retries
+
+    async def async_call(
+        self, call: Callable[[], Awaitable[Any]], idempotent: bool
+    ) -> Any:
+        attempts = READ_ATTEMPTS if idempotent else self._write_attempts
+        attempt = 1
+        while True:
+            self.breaker.before_call()
+            try:
+                result = await call()
+            except Exception as ex:
+                if not _is_transient(ex):
+                    self.breaker.record_aborted()
+                    raise
+                self.breaker.record_failure()
+                limit = READ_ATTEMPTS if _is_unsent(ex) else attempts
+                if attempt >= limit or self.breaker.state == CIRCUIT_OPEN:
+                    raise
+                delay = random.uniform(
+                    0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempt)
+                )
+                _LOGGER.debug("Retrying in %.1f s after %r", delay, ex)
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                self.breaker.record_aborted()
+                raise
+            self.breaker.record_success()
+            return result
+
+
+def _is_transient(ex: Exception) -> bool:
+    if isinstance(ex, httpx.HTTPStatusError):
+        return ex.response.status_code >= 500 or ex.response.status_code == 429
+    return isinstance(ex, (httpx.TransportError, asyncio.TimeoutError))
+
+
+def _is_unsent(ex: Exception) -> bool:
+    return isinstance(ex, (httpx.ConnectError, httpx.ConnectTimeout))
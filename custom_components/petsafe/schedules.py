@@ -0,0 +1,71 @@
+"""Cache of the feeding schedules of SmartFeed feeders."""
+from __future__ import annotations
+
+import time
+from collections.abc import Awaitable, Callable
+
+
+def normalize_time(value: str) -> str:
+    """Return a time such as 7:30:00 as 07:30, the format used by the API."""
+    hours, minutes = value.split(":")[:2]
+    return f"{int(hours):02d}:{int(minutes):02d}"
+
+
+class FeederSchedules:
+    """Feeding schedules of a single feeder indexed by normalized time.
+
+    The schedules are loaded on first use and again once the TTL expired, and
+    are updated in place after every change made through the integration.
+    """
+
+    def __init__(self, ttl: int):
+        self.by_time: dict[str, dict] = None
+        self._ttl = ttl
+        self._updated: float = None
+
+    @property
+    def expired(self) -> bool:
+        return self._updated is None or time.monotonic() - self._updated >= self._ttl
+
+    async def async_load(
+        self, fetch: Callable[[], Awaitable[list[dict]]], force: bool = False
+    ) -> dict[str, dict]:
+        """Return the schedules, downloading them with fetch if needed."""
+        if force or self.expired:
+            self.set_all(await fetch())
+        return self.by_time
+
+    def set_all(self, schedules: list[dict]) -> None:
+        self.by_time = {normalize_time(x["time"]): x for x in schedules}
+        self._updated = time.monotonic()
+
+    def set(self, schedule: dict) -> None:
+        if self.by_time is not None:
+            self.by_time[normalize_time(schedule["time"])] = schedule
+
+    def remove(self, value: str) -> None:
+        if self.by_time is not None:
+            self.by_time.pop(normalize_time(value), None)
+
+    def invalidate(self) -> None:
+        self._updated = None
+
+
+def plan_schedule_changes(
+    current: dict[str, dict], desired: dict[str, int]
+) -> tuple[list[tuple[dict, str, int]], list[tuple[str, int]], list[dict]]:
+    """Return the modifies, adds and deletes which turn current into desired.
+
+    Both are keyed by normalized time. Schedules at times no longer wanted are
+    moved to the new times rather than deleted and added again, so the number
+    of API calls is as small as possible.
+    """
+    modifies = [
+        (current[x], x, amount)
+        for x, amount in desired.items()
+        if x in current and current[x].get("amount") != amount
+    ]
+    removed = [schedule for x, schedule in current.items() if x not in desired]
+    added = [(x, amount) for x, amount in desired.items() if x not in current]
+    modifies += [(schedule, x, amount) for schedule, (x, amount) in zip(removed, added)]
+    return modifies, added[len(removed) :], removed[len(added) :]
@@ -1,22 +1,14 @@
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers.entity import EntityCategory
 
-from . import PetSafeCoordinator, SelectEntities
+from . import PetSafeRuntimeData, SelectEntities
 from .const import DOMAIN
 
 
 async def async_setup_entry(hass: HomeAssistant, config: ConfigEntry, add_entities):
-    coordinator: PetSafeCoordinator = hass.data[DOMAIN][config.entry_id]
-
-    litterboxes = None
-    try:
-        litterboxes = await coordinator.get_litterboxes()
-    except Exception as ex:
-        raise ConfigEntryNotReady(
-            "Failed to retrieve PetSafe scoopfree devices"
-        ) from ex
+    runtime: PetSafeRuntimeData = hass.data[DOMAIN][config.entry_id]
+    litterboxes = runtime.litterboxes
 
     entities = []
     for litterbox in litterboxes:
@@ -26,7 +18,7 @@ async def async_setup_entry(hass: HomeAssistant, config: ConfigEntry, add_entiti
                 name="Rake Timer",
                 device_type="rake_timer",
                 device=litterbox,
-                coordinator=coordinator,
+                coordinator=runtime.litterbox_coordinator,
                 options=["5", "10", "15", "20", "25", "30"],
                 entity_category=EntityCategory.CONFIG,
             )
@@ -1,25 +1,16 @@
-from datetime import timedelta
 from homeassistant.config_entries import ConfigEntry
 
 from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers.entity import EntityCategory
 
-from . import PetSafeCoordinator, SensorEntities
+from . import PetSafeRuntimeData, SensorEntities
 from .const import DOMAIN
 
-SCAN_INTERVAL = timedelta(seconds=60)
-
 
 async def async_setup_entry(hass: HomeAssistant, config: ConfigEntry, add_entities):
-    coordinator: PetSafeCoordinator = hass.data[DOMAIN][config.entry_id]
-    feeders = None
-    litterboxes = None
-    try:
-        feeders = await coordinator.get_feeders()
-        litterboxes = await coordinator.get_litterboxes()
-    except Exception as ex:
-        raise ConfigEntryNotReady("Failed to retrieve PetSafe devices") from ex
+    runtime: PetSafeRuntimeData = hass.data[DOMAIN][config.entry_id]
+    feeders = runtime.feeders
+    litterboxes = runtime.litterboxes
 
     entities = []
     for feeder in feeders:
@@ -30,7 +21,7 @@ async def async_setup_entry(hass: HomeAssistant, config: ConfigEntry, add_entiti
                 device_class="battery",
                 device_type="battery",
                 device=feeder,
-                coordinator=coordinator,
+                coordinator=runtime.diagnostics_coordinator,
             )
         )
         entities.append(
@@ -40,7 +31,17 @@ async def async_setup_entry(hass: HomeAssistant, config: ConfigEntry, add_entiti
                 device_type="last_feeding",
                 device_class="timestamp",
                 device=feeder,
-                coordinator=coordinator,
+                coordinator=runtime.feeder_coordinator,
+            )
+        )
+        entities.append(
+            SensorEntities.PetSafeFeederSensorEntity(
+                hass=hass,
+                name="Feedings Today",
+                device_type="feedings_today",
+                device=feeder,
+                coordinator=runtime.feeder_coordinator,
+                icon="mdi:counter",
             )
         )
         entities.append(
@@ -49,17 +50,27 @@ async def async_setup_entry(hass: HomeAssistant, config: ConfigEntry, add_entiti
                 name="Food Level",
                 device_type="food_level",
                 device=feeder,
-                coordinator=coordinator,
+                coordinator=runtime.feeder_coordinator,
                 icon="mdi:bowl",
             )
         )
+        entities.append(
+            SensorEntities.PetSafeFeederSensorEntity(
+                hass=hass,
+                name="Feeding Schedules",
+                device_type="schedules",
+                device=feeder,
+                coordinator=runtime.feeder_coordinator,
+                icon="mdi:calendar-clock",
+            )
+        )
         entities.append(
             SensorEntities.PetSafeFeederSensorEntity(
                 hass=hass,
                 name="Signal Strength",
                 device_type="signal_strength",
                 device=feeder,
-                coordinator=coordinator,
+                coordinator=runtime.diagnostics_coordinator,
                 device_class="signal_strength",
                 entity_category=EntityCategory.DIAGNOSTIC,
             )
@@ -71,7 +82,7 @@ async def async_setup_entry(hass: HomeAssistant, config: ConfigEntry, add_entiti
                 name="Rake Counter",
                 device_type="rake_counter",
                 device=litterbox,
-                coordinator=coordinator,
+                coordinator=runtime.litterbox_coordinator,
                 icon="mdi:rake",
             )
         )
@@ -81,7 +92,7 @@ async def async_setup_entry(hass: HomeAssistant, config: ConfigEntry, add_entiti
                 name="Rake Status",
                 device_type="rake_status",
                 device=litterbox,
-                coordinator=coordinator,
+                coordinator=runtime.litterbox_coordinator,
                 icon="mdi:rake",
             )
         )
@@ -91,19 +102,54 @@ async def async_setup_entry(hass: HomeAssistant, config: ConfigEntry, add_entiti
                 name="Signal Strength",
                 device_type="signal_strength",
                 device=litterbox,
-                coordinator=coordinator,
+                coordinator=runtime.diagnostics_coordinator,
                 device_class="signal_strength",
                 entity_category=EntityCategory.DIAGNOSTIC,
             )
         )
+        entities.append(
+            SensorEntities.PetSafeLitterboxSensorEntity(
+                hass=hass,
+                name="Rakes Today",
+                device_type="rakes_today",
+                device=litterbox,
+                coordinator=runtime.litterbox_coordinator,
+                icon="mdi:counter",
+            )
+        )
+        entities.append(
+            SensorEntities.PetSafeLitterboxSensorEntity(
+                hass=hass,
+                name="Cat Visits Today",
+                device_type="cat_visits_today",
+                device=litterbox,
+                coordinator=runtime.litterbox_coordinator,
+                icon="mdi:cat",
+            )
+        )
         entities.append(
             SensorEntities.PetSafeLitterboxSensorEntity(
                 hass=hass,
                 name="Last Cleaning",
                 device_type="last_cleaning",
                 device=litterbox,
-                coordinator=coordinator,
+                coordinator=runtime.litterbox_coordinator,
                 device_class="timestamp",
             )
         )
+    entities.append(
+        SensorEntities.PetSafeCircuitBreakerSensorEntity(
+            config, runtime.client.resilience.breaker
+        )
+    )
+    entities.append(
+        SensorEntities.PetSafeMetricsSensorEntity(
+            config, "API Requests", "api_requests", runtime.client.metrics
+        )
+    )
+    entities.append(
+        SensorEntities.PetSafeMetricsSensorEntity(
+            config, "API Latency", "api_latency", runtime.client.metrics
+        )
+    )
     add_entities(entities)
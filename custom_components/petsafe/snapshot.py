@@ -0,0 +1,60 @@
+"""Last known PetSafe devices persisted across restarts."""
+from __future__ import annotations
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+import petsafe
+
+from .const import DOMAIN, SNAPSHOT_SAVE_DELAY, STORAGE_VERSION
+
+
+class PetSafeSnapshot:
+    """Raw feeder and litterbox payloads of the last successful refreshes.
+
+    Saves are delayed so that refreshes in quick succession are written once.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry):
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}")
+        self.feeders: list[dict] = None
+        self.litterboxes: list[dict] = None
+
+    async def async_load(self) -> bool:
+        """Load the snapshot and return whether it holds every device type."""
+        data = await self._store.async_load()
+        if data is not None:
+            self.feeders = data.get("feeders")
+            self.litterboxes = data.get("litterboxes")
+        return self.feeders is not None and self.litterboxes is not None
+
+    def get_feeders(
+        self, client: petsafe.PetSafeClient
+    ) -> list[petsafe.devices.DeviceSmartFeed]:
+        return [petsafe.devices.DeviceSmartFeed(client, x) for x in self.feeders]
+
+    def get_litterboxes(
+        self, client: petsafe.PetSafeClient
+    ) -> list[petsafe.devices.DeviceScoopfree]:
+        return [petsafe.devices.DeviceScoopfree(client, x) for x in self.litterboxes]
+
+    @callback
+    def async_save_feeders(
+        self, feeders: list[petsafe.devices.DeviceSmartFeed]
+    ) -> None:
+        self.feeders = [x.data for x in feeders]
+        self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def async_save_litterboxes(
+        self, litterboxes: list[petsafe.devices.DeviceScoopfree]
+    ) -> None:
+        self.litterboxes = [x.data for x in litterboxes]
+        self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
+
+    def _data_to_save(self) -> dict:
+        return {"feeders": self.feeders, "litterboxes": self.litterboxes}
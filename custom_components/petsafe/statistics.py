@@ -0,0 +1,129 @@
+"""Import of hourly feeding and cleaning statistics into the recorder."""
+from __future__ import annotations
+
+import datetime
+import logging
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util, slugify
+
+import petsafe
+
+from .const import (
+    CAT_IN_BOX,
+    DOMAIN,
+    FEED_DONE,
+    RAKE_FINISHED,
+    STATISTICS_LOOKBACK_HOURS,
+)
+from .history import DeviceHistory, PetSafeHistory
+
+_LOGGER = logging.getLogger(__name__)
+
+# Event code, statistic suffix and name, and whether the event values are
+# summed rather than the events counted.
+FEEDER_STATISTICS = ((FEED_DONE, "portions_fed", "Portions Fed", True),)
+LITTERBOX_STATISTICS = (
+    (RAKE_FINISHED, "rake_cycles", "Rake Cycles", False),
+    (CAT_IN_BOX, "cat_visits", "Cat Visits", False),
+)
+
+
+class PetSafeStatistics:
+    """Imports the event history as external long-term statistics.
+
+    Each run imports again the last hour already imported and the hours of the
+    look-back window, as events may reach the history late, and writes every
+    complete hour with events in a single batch per statistic. The recorder
+    replaces the hours it already has and derives the daily and monthly
+    aggregates from them.
+    """
+
+    def __init__(self, hass: HomeAssistant, history: PetSafeHistory):
+        self._hass = hass
+        self._history = history
+
+    async def async_import(
+        self,
+        feeders: list[petsafe.devices.DeviceSmartFeed],
+        litterboxes: list[petsafe.devices.DeviceScoopfree],
+    ) -> None:
+        end = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+        for devices, statistics in (
+            (feeders, FEEDER_STATISTICS),
+            (litterboxes, LITTERBOX_STATISTICS),
+        ):
+            for device in devices:
+                history = self._history.device(device.api_name)
+                for code, suffix, name, use_value in statistics:
+                    await self._async_import_statistic(
+                        history,
+                        code,
+                        use_value,
+                        StatisticMetaData(
+                            has_mean=False,
+                            has_sum=True,
+                            name=f"{device.friendly_name} {name}",
+                            source=DOMAIN,
+                            statistic_id=f"{DOMAIN}:{slugify(device.api_name)}_{suffix}",
+                            unit_of_measurement=None,
+                        ),
+                        end,
+                    )
+
+    async def _async_import_statistic(
+        self,
+        history: DeviceHistory,
+        code: str,
+        use_value: bool,
+        metadata: StatisticMetaData,
+        end: datetime.datetime,
+    ) -> None:
+        statistic_id = metadata["statistic_id"]
+        # The window holds at most one row per hour, so one more row reaches
+        # the hour before it, whose sum the import continues from.
+        last = await get_instance(self._hass).async_add_executor_job(
+            get_last_statistics,
+            self._hass,
+            STATISTICS_LOOKBACK_HOURS + 1,
+            statistic_id,
+            True,
+            {"sum"},
+        )
+        rows = last.get(statistic_id, [])
+        start = 0
+        total = 0
+        if rows:
+            start = min(
+                int(rows[0]["start"]),
+                int(end.timestamp()) - STATISTICS_LOOKBACK_HOURS * 3600,
+            )
+            total = next((x["sum"] or 0 for x in rows if x["start"] < start), 0)
+
+        hours: dict[int, int] = {}
+        for timestamp, value in history.events(
+            code, start * 1000, int(end.timestamp() * 1000) - 1
+        ):
+            hour = timestamp // 3600000 * 3600
+            hours[hour] = hours.get(hour, 0) + (value if use_value else 1)
+        if not hours:
+            return
+
+        statistics = []
+        for hour in sorted(hours):
+            total += hours[hour]
+            statistics.append(
+                StatisticData(
+                    start=dt_util.utc_from_timestamp(hour),
+                    state=hours[hour],
+                    sum=total,
+                )
+            )
+        _LOGGER.debug("Importing %d hours of %s", len(statistics), statistic_id)
+        async_add_external_statistics(self._hass, metadata, statistics)
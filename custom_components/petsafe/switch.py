@@ -1,22 +1,14 @@
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers.entity import EntityCategory
 
-from . import PetSafeCoordinator, SwitchEntities
+from . import PetSafeRuntimeData, SwitchEntities
 from .const import DOMAIN
 
 
 async def async_setup_entry(hass: HomeAssistant, config: ConfigEntry, add_entities):
-    coordinator: PetSafeCoordinator = hass.data[DOMAIN][config.entry_id]
-
-    feeders = None
-    try:
-        feeders = await coordinator.get_feeders()
-    except Exception as ex:
-        raise ConfigEntryNotReady(
-            "Failed to retrieve PetSafe SmartFeed devices"
-        ) from ex
+    runtime: PetSafeRuntimeData = hass.data[DOMAIN][config.entry_id]
+    feeders = runtime.feeders
 
     entities = []
     for feeder in feeders:
@@ -27,7 +19,7 @@ async def async_setup_entry(hass: HomeAssistant, config: ConfigEntry, add_entiti
                 device_type="feeding_paused",
                 icon="mdi:pause",
                 device=feeder,
-                coordinator=coordinator,
+                coordinator=runtime.feeder_coordinator,
                 entity_category=EntityCategory.CONFIG,
             )
         )
@@ -38,7 +30,7 @@ async def async_setup_entry(hass: HomeAssistant, config: ConfigEntry, add_entiti
                 device_type="child_lock",
                 icon="mdi:lock-open",
                 device=feeder,
-                coordinator=coordinator,
+                coordinator=runtime.feeder_coordinator,
                 entity_category=EntityCategory.CONFIG,
             )
         )
@@ -49,7 +41,7 @@ async def async_setup_entry(hass: HomeAssistant, config: ConfigEntry, add_entiti
                 device_type="slow_feed",
                 icon="mdi:tortoise",
                 device=feeder,
-                coordinator=coordinator,
+                coordinator=runtime.feeder_coordinator,
                 entity_category=EntityCategory.CONFIG,
             )
         )
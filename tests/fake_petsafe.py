@@ -0,0 +1,144 @@
+"""An in-process fake of the PetSafe cloud for the tests."""
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import time
+from typing import Any
+
+import httpx
+
+from custom_components.petsafe.auth import PetSafeAuthClient
+from custom_components.petsafe.metrics import PetSafeMetrics
+from custom_components.petsafe.resilience import PetSafeResilience
+
+FEEDERS = "smart-feed/feeders"
+LITTERBOXES = "scoopfree/product/product"
+
+
+def fake_token(lifetime: int = 86400) -> str:
+    """Return a JWT which only carries its expiry, enough for the client."""
+    payload = json.dumps({"exp": time.time() + lifetime}).encode()
+    return "header.{}.signature".format(
+        base64.urlsafe_b64encode(payload).decode().rstrip("=")
+    )
+
+
+class FakePetSafe:
+    """The PetSafe cloud API, served to httpx through a mock transport.
+
+    Every request is recorded as (method, path, json body). Each response is
+    delayed by the latency, and the queued faults, exceptions to raise or
+    status codes to answer with, are served first in order. Paths starting
+    with one of the unavailable prefixes always answer 503.
+    """
+
+    def __init__(self, latency: float = 0):
+        self.latency = latency
+        self.feeders: dict[str, dict] = {}
+        self.schedules: dict[str, dict[str, dict]] = {}
+        self.litterboxes: dict[str, dict] = {}
+        self.requests: list[tuple[str, str, Any]] = []
+        self.faults: list[Exception | int] = []
+        self.unavailable: set[str] = set()
+        self._next_id = 1000
+
+    def add_feeder(self, thing_name: str, schedules: dict[str, int] = None) -> None:
+        self.feeders[thing_name] = {
+            "thing_name": thing_name,
+            "friendly_name": thing_name,
+            "settings": {"child_lock": False, "paused": False},
+        }
+        self.schedules[thing_name] = {}
+        for time_, amount in (schedules or {}).items():
+            self._add_schedule(thing_name, time_, amount)
+
+    def add_litterbox(self, thing_name: str) -> None:
+        self.litterboxes[thing_name] = {
+            "thingName": thing_name,
+            "friendlyName": thing_name,
+            "shadow": {"state": {"reported": {"rakeCount": 0}}},
+        }
+
+    def writes(self) -> list[tuple[str, str, Any]]:
+        """Return the requests other than reads, in the order received."""
+        return [x for x in self.requests if x[0] != "GET"]
+
+    def create_client(self, write_retries: int = 0) -> PetSafeAuthClient:
+        return PetSafeAuthClient(
+            "user@example.com",
+            fake_token(),
+            "refresh-token",
+            "access-token",
+            httpx.AsyncClient(transport=httpx.MockTransport(self.handle)),
+            PetSafeResilience(write_retries),
+            PetSafeMetrics(),
+        )
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.strip("/")
+        body = json.loads(request.content) if request.content else None
+        self.requests.append((request.method, path, body))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.faults:
+            fault = self.faults.pop(0)
+            if isinstance(fault, Exception):
+                raise fault
+            return httpx.Response(fault)
+        if any(path.startswith(x) for x in self.unavailable):
+            return httpx.Response(503)
+        result = self._route(request.method, path, body)
+        if result is None:
+            return httpx.Response(404)
+        return httpx.Response(200, json=result)
+
+    def _route(self, method: str, path: str, body: Any) -> Any:
+        if path == FEEDERS:
+            return list(self.feeders.values())
+        if path == LITTERBOXES:
+            return {"data": list(self.litterboxes.values())}
+        if path.startswith(LITTERBOXES + "/"):
+            thing_name, _, resource = path[len(LITTERBOXES) + 1 :].partition("/")
+            if thing_name not in self.litterboxes:
+                return None
+            if resource == "":
+                return {"data": self.litterboxes[thing_name]}
+            if resource == "activity":
+                return {"data": []}
+            return None
+        if not path.startswith(FEEDERS + "/"):
+            return None
+        thing_name, _, resource = path[len(FEEDERS) + 1 :].partition("/")
+        if thing_name not in self.feeders:
+            return None
+        schedules = self.schedules[thing_name]
+        if resource == "":
+            return self.feeders[thing_name]
+        if resource == "messages":
+            return []
+        if resource == "schedules":
+            if method == "POST":
+                return {"id": self._add_schedule(thing_name, **body)}
+            return list(schedules.values())
+        if resource.startswith("schedules/"):
+            schedule_id = resource.split("/")[1]
+            if schedule_id not in schedules:
+                return None
+            if method == "PUT":
+                schedules[schedule_id].update(body)
+            elif method == "DELETE":
+                del schedules[schedule_id]
+            return {}
+        return None
+
+    def _add_schedule(self, thing_name: str, time: str, amount: int) -> str:
+        self._next_id += 1
+        schedule_id = str(self._next_id)
+        self.schedules[thing_name][schedule_id] = {
+            "id": schedule_id,
+            "time": time,
+            "amount": amount,
+        }
+        return schedule_id
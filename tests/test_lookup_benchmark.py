@@ -0,0 +1,111 @@
+"""Micro-benchmark of the per-refresh device lookups and entity dispatch."""
+from __future__ import annotations
+
+import asyncio
+import timeit
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+import petsafe  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.petsafe.coalescer import RequestCoalescer  # noqa: E402
+from custom_components.petsafe.coordinator import (  # noqa: E402
+    PetSafeData,
+    PetSafeFeederCoordinator,
+)
+from custom_components.petsafe.history import PetSafeAccountHistory  # noqa: E402
+
+from .fake_petsafe import FakePetSafe  # noqa: E402
+
+# Entities created for every simulated device.
+ENTITIES_PER_DEVICE = 6
+
+
+def create_data(devices: int) -> PetSafeData:
+    return PetSafeData(
+        [
+            petsafe.devices.DeviceSmartFeed(None, {"thing_name": f"feeder-{i}"})
+            for i in range(devices)
+        ],
+        [
+            petsafe.devices.DeviceScoopfree(None, {"thingName": f"litterbox-{i}"})
+            for i in range(devices)
+        ],
+        {},
+    )
+
+
+@pytest.mark.parametrize("devices", [1, 10, 100])
+def test_indexed_lookups(devices: int) -> None:
+    """Every entity finds its device in the index, in constant time."""
+    data = create_data(devices)
+    names = [x.api_name for x in data.feeders for _ in range(ENTITIES_PER_DEVICE)]
+
+    def scan() -> None:
+        for name in names:
+            next(x for x in data.feeders if x.api_name == name)
+
+    def index() -> None:
+        for name in names:
+            data.feeders_by_api_name[name]
+
+    scanned = min(timeit.repeat(scan, number=10, repeat=3)) / 10
+    indexed = min(timeit.repeat(index, number=10, repeat=3)) / 10
+
+    print(
+        f"{devices} devices: scan {scanned * 1e6:.1f} us,"
+        f" index {indexed * 1e6:.1f} us per refresh"
+    )
+    assert all(data.feeders_by_api_name[x].api_name == x for x in names)
+    if devices == 100:
+        assert indexed * 10 < scanned
+
+
+@pytest.mark.parametrize("devices", [1, 10, 100])
+def test_dispatch_to_changed_device(tmp_path, devices: int) -> None:
+    """A refresh changing one device only notifies the entities of that device."""
+
+    async def run() -> tuple[int, int, float]:
+        hass = HomeAssistant(str(tmp_path))
+        coordinator = PetSafeFeederCoordinator(
+            hass,
+            FakePetSafe().create_client(),
+            {},
+            {},
+            RequestCoalescer(),
+            PetSafeAccountHistory(),
+        )
+        coordinator.data = create_data(devices)
+        notified = []
+        for feeder in coordinator.data.feeders:
+            for _ in range(ENTITIES_PER_DEVICE):
+                coordinator.async_add_listener(
+                    lambda name=feeder.api_name: notified.append(name),
+                    feeder.api_name,
+                )
+
+        coordinator.async_update_listeners()
+        everyone = len(notified)
+
+        notified.clear()
+        coordinator.last_diff = {"feeder-0": {"settings.paused": (False, True)}}
+        coordinator.async_update_listeners()
+        assert set(notified) == {"feeder-0"}
+        changed = len(notified)
+
+        elapsed = min(
+            timeit.repeat(coordinator.async_update_listeners, number=10, repeat=3)
+        )
+        return everyone, changed, elapsed / 10
+
+    everyone, changed, elapsed = asyncio.run(run())
+
+    print(
+        f"{devices} devices: {changed} of {everyone} entities notified"
+        f" in {elapsed * 1e6:.1f} us"
+    )
+    assert everyone == devices * ENTITIES_PER_DEVICE
+    assert changed == ENTITIES_PER_DEVICE
@@ -0,0 +1,94 @@
+"""Benchmark of the feeder and litterbox refreshes against a slow fake cloud."""
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.petsafe import resilience  # noqa: E402
+from custom_components.petsafe.coalescer import RequestCoalescer  # noqa: E402
+from custom_components.petsafe.coordinator import (  # noqa: E402
+    PetSafeFeederCoordinator,
+    PetSafeLitterboxCoordinator,
+)
+from custom_components.petsafe.history import PetSafeAccountHistory  # noqa: E402
+
+from .fake_petsafe import LITTERBOXES, FakePetSafe  # noqa: E402
+
+# Seconds every response of the fake cloud takes.
+LATENCY = 0.05
+
+
+def create_coordinators(
+    hass: HomeAssistant, server: FakePetSafe
+) -> tuple[PetSafeFeederCoordinator, PetSafeLitterboxCoordinator]:
+    client = server.create_client()
+    coalescer = RequestCoalescer()
+    history = PetSafeAccountHistory()
+    return (
+        PetSafeFeederCoordinator(hass, client, {}, {}, coalescer, history),
+        PetSafeLitterboxCoordinator(hass, client, {}, {}, coalescer, history),
+    )
+
+
+def create_server() -> FakePetSafe:
+    server = FakePetSafe(LATENCY)
+    for i in range(3):
+        server.add_feeder(f"feeder-{i}", {"07:00": 4})
+        server.add_litterbox(f"litterbox-{i}")
+    return server
+
+
+def test_concurrent_refresh_costs_the_slowest_fetch(tmp_path) -> None:
+    """Refreshing both device types at once takes about as long as one."""
+
+    async def run() -> tuple[float, float]:
+        hass = HomeAssistant(str(tmp_path))
+        feeders, litterboxes = create_coordinators(hass, create_server())
+        start = time.monotonic()
+        await feeders.async_refresh()
+        await litterboxes.async_refresh()
+        sequential = time.monotonic() - start
+
+        feeders, litterboxes = create_coordinators(hass, create_server())
+        start = time.monotonic()
+        await asyncio.gather(feeders.async_refresh(), litterboxes.async_refresh())
+        concurrent = time.monotonic() - start
+
+        assert feeders.last_update_success and litterboxes.last_update_success
+        assert len(feeders.data.feeders) == len(litterboxes.data.litterboxes) == 3
+        return sequential, concurrent
+
+    sequential, concurrent = asyncio.run(run())
+
+    print(f"sequential {sequential:.3f} s, concurrent {concurrent:.3f} s")
+    # Each refresh lists its devices, then fetches their details at once.
+    assert sequential >= 4 * LATENCY
+    assert concurrent < 0.75 * sequential
+
+
+def test_failing_litterboxes_do_not_hold_back_feeders(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(resilience, "RETRY_BASE_DELAY", 0)
+    server = create_server()
+
+    async def run() -> None:
+        hass = HomeAssistant(str(tmp_path))
+        feeders, litterboxes = create_coordinators(hass, server)
+        await asyncio.gather(feeders.async_refresh(), litterboxes.async_refresh())
+        snapshot = litterboxes.data
+
+        server.unavailable.add(LITTERBOXES)
+        server.feeders["feeder-0"]["settings"]["paused"] = True
+        await asyncio.gather(feeders.async_refresh(), litterboxes.async_refresh())
+
+        assert feeders.last_update_success
+        assert feeders.data.feeders_by_api_name["feeder-0"].data["settings"]["paused"]
+        assert not litterboxes.last_update_success
+        assert litterboxes.data is snapshot
+
+    asyncio.run(run())
@@ -0,0 +1,166 @@
+"""Tests of the retries and circuit breaker against a fault-injecting server."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("homeassistant")
+
+from custom_components.petsafe import resilience  # noqa: E402
+from custom_components.petsafe.resilience import (  # noqa: E402
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    CircuitOpenError,
+)
+
+from .fake_petsafe import FEEDERS, FakePetSafe  # noqa: E402
+
+MEALS = f"{FEEDERS}/feeder/meals"
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch) -> None:
+    monkeypatch.setattr(resilience, "RETRY_BASE_DELAY", 0)
+
+
+def test_reads_are_retried_up_to_the_read_attempts() -> None:
+    server = FakePetSafe()
+    server.faults = [503, httpx.ReadTimeout("timed out"), 503, 503]
+    client = server.create_client()
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(client.api_get(FEEDERS))
+
+    assert len(server.requests) == resilience.READ_ATTEMPTS
+    assert server.faults == [503]
+
+
+def test_reads_succeed_after_transient_failures() -> None:
+    server = FakePetSafe()
+    server.add_feeder("feeder")
+    server.faults = [503, 429]
+    client = server.create_client()
+
+    feeders = asyncio.run(client.get_feeders())
+
+    assert [x.api_name for x in feeders] == ["feeder"]
+    assert len(server.requests) == 3
+    assert client.resilience.breaker.failures == 0
+
+
+def test_reads_are_not_retried_on_client_errors() -> None:
+    server = FakePetSafe()
+    server.faults = [404]
+    client = server.create_client()
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(client.api_get(FEEDERS))
+
+    assert len(server.requests) == 1
+
+
+@pytest.mark.parametrize("fault", [503, httpx.ReadTimeout("timed out")])
+def test_sent_writes_are_not_retried(fault) -> None:
+    server = FakePetSafe()
+    server.faults = [fault]
+    client = server.create_client()
+
+    with pytest.raises(httpx.HTTPError):
+        asyncio.run(client.api_post(MEALS, {"amount": 1}))
+
+    assert len(server.requests) == 1
+
+
+def test_writes_are_retried_as_configured() -> None:
+    server = FakePetSafe()
+    server.faults = [503, 503, 503]
+    client = server.create_client(write_retries=2)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(client.api_post(MEALS, {"amount": 1}))
+
+    assert len(server.requests) == 3
+
+
+def test_unsent_writes_are_retried() -> None:
+    server = FakePetSafe()
+    server.add_feeder("feeder", {"07:00": 4})
+    server.faults = [httpx.ConnectError("refused"), httpx.ConnectTimeout("timeout")]
+    client = server.create_client()
+
+    asyncio.run(client.api_put(f"{FEEDERS}/feeder/schedules/1001", {"amount": 1}))
+
+    assert len(server.requests) == 3
+
+
+def test_circuit_opens_after_consecutive_failures() -> None:
+    server = FakePetSafe()
+    server.faults = [503] * resilience.CIRCUIT_FAILURE_THRESHOLD
+    client = server.create_client()
+    breaker = client.resilience.breaker
+
+    async def run() -> None:
+        for _ in range(resilience.CIRCUIT_FAILURE_THRESHOLD):
+            assert breaker.state == CIRCUIT_CLOSED
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.api_post(MEALS, {"amount": 1})
+        assert breaker.state == CIRCUIT_OPEN
+        with pytest.raises(CircuitOpenError):
+            await client.api_get(FEEDERS)
+
+    asyncio.run(run())
+
+    assert len(server.requests) == resilience.CIRCUIT_FAILURE_THRESHOLD
+
+
+def test_half_open_circuit_lets_a_single_trial_through(monkeypatch) -> None:
+    monkeypatch.setattr(resilience, "CIRCUIT_RESET_TIMEOUT", 0)
+    server = FakePetSafe()
+    server.faults = [503] * resilience.CIRCUIT_FAILURE_THRESHOLD
+    client = server.create_client()
+    breaker = client.resilience.breaker
+
+    async def run() -> None:
+        for _ in range(resilience.CIRCUIT_FAILURE_THRESHOLD):
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.api_post(MEALS, {"amount": 1})
+        assert breaker.state == CIRCUIT_OPEN
+
+        server.latency = 0.05
+        trial = asyncio.create_task(client.api_get(FEEDERS))
+        await asyncio.sleep(0)
+        assert breaker.state == CIRCUIT_HALF_OPEN
+        for _ in range(3):
+            with pytest.raises(CircuitOpenError):
+                await client.api_get(FEEDERS)
+        await trial
+        assert breaker.state == CIRCUIT_CLOSED
+        await client.api_get(FEEDERS)
+
+    asyncio.run(run())
+
+    assert len(server.requests) == resilience.CIRCUIT_FAILURE_THRESHOLD + 2
+
+
+def test_failed_half_open_trial_opens_the_circuit_again(monkeypatch) -> None:
+    monkeypatch.setattr(resilience, "CIRCUIT_RESET_TIMEOUT", 0)
+    server = FakePetSafe()
+    server.faults = [503] * (resilience.CIRCUIT_FAILURE_THRESHOLD + 1)
+    client = server.create_client()
+    breaker = client.resilience.breaker
+
+    async def run() -> None:
+        for _ in range(resilience.CIRCUIT_FAILURE_THRESHOLD):
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.api_post(MEALS, {"amount": 1})
+        # The trial is not retried, even though reads are.
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.api_get(FEEDERS)
+
+    asyncio.run(run())
+
+    assert breaker.state == CIRCUIT_OPEN
+    assert len(server.requests) == resilience.CIRCUIT_FAILURE_THRESHOLD + 1
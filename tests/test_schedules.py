@@ -0,0 +1,94 @@
+"""Tests of the planning of feeding schedule changes."""
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+# Loaded by path, the package itself needs Home Assistant to be imported.
+_SPEC = importlib.util.spec_from_file_location(
+    "petsafe_schedules",
+    Path(__file__).parents[1] / "custom_components" / "petsafe" / "schedules.py",
+)
+schedules = importlib.util.module_from_spec(_SPEC)
+_SPEC.loader.exec_module(schedules)
+
+
+class FakeFeederBackend:
+    """Schedules of a feeder, counting the API calls made to change them."""
+
+    def __init__(self, amounts: dict[str, int]):
+        self.schedules = {
+            str(i): {"id": str(i), "time": time, "amount": amount}
+            for i, (time, amount) in enumerate(amounts.items())
+        }
+        self.calls = 0
+        self._next_id = len(self.schedules)
+
+    def by_time(self) -> dict[str, dict]:
+        return {x["time"]: dict(x) for x in self.schedules.values()}
+
+    def amounts(self) -> dict[str, int]:
+        return {x["time"]: x["amount"] for x in self.schedules.values()}
+
+    def apply(self, modifies, adds, deletes) -> None:
+        for schedule, time, amount in modifies:
+            self.calls += 1
+            self.schedules[schedule["id"]].update(time=time, amount=amount)
+        for time, amount in adds:
+            self.calls += 1
+            self.schedules[str(self._next_id)] = {
+                "id": str(self._next_id),
+                "time": time,
+                "amount": amount,
+            }
+            self._next_id += 1
+        for schedule in deletes:
+            self.calls += 1
+            del self.schedules[schedule["id"]]
+
+
+@pytest.mark.parametrize(
+    ("current", "desired", "calls"),
+    [
+        # Nothing to do.
+        ({"07:00": 4, "18:00": 4}, {"07:00": 4, "18:00": 4}, 0),
+        # Amount only changes are modified in place.
+        ({"07:00": 4, "18:00": 4}, {"07:00": 2, "18:00": 4}, 1),
+        # Schedules at unwanted times are moved instead of deleted and added.
+        ({"07:00": 4, "18:00": 4}, {"08:00": 4, "19:00": 3}, 2),
+        # Surplus schedules are deleted.
+        ({"07:00": 4, "12:00": 2, "18:00": 4}, {"09:00": 4}, 3),
+        # Surplus times are added.
+        ({"07:00": 4}, {"06:00": 4, "12:00": 2, "18:00": 4}, 3),
+        ({}, {"07:00": 4, "18:00": 4}, 2),
+        ({"07:00": 4, "18:00": 4}, {}, 2),
+    ],
+)
+def test_plan_schedule_changes(
+    current: dict[str, int], desired: dict[str, int], calls: int
+) -> None:
+    backend = FakeFeederBackend(current)
+
+    backend.apply(*schedules.plan_schedule_changes(backend.by_time(), desired))
+
+    assert backend.amounts() == desired
+    assert backend.calls == calls
+
+
+def test_plan_schedule_changes_is_minimal() -> None:
+    """Every time changes its amount, or is moved, added or deleted once."""
+    current = {"06:00": 1, "07:00": 4, "12:00": 2, "18:00": 4, "21:00": 1}
+    desired = {"07:00": 4, "12:00": 3, "19:00": 4}
+    backend = FakeFeederBackend(current)
+
+    modifies, adds, deletes = schedules.plan_schedule_changes(
+        backend.by_time(), desired
+    )
+    backend.apply(modifies, adds, deletes)
+
+    assert backend.amounts() == desired
+    # 12:00 changes its amount, 19:00 reuses a schedule, two are deleted.
+    assert (len(modifies), len(adds), len(deletes)) == (2, 0, 2)
+    assert backend.calls == 4
@@ -0,0 +1,84 @@
+"""Tests of the set_schedules path of the feeder coordinator."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.petsafe.coalescer import RequestCoalescer  # noqa: E402
+from custom_components.petsafe.coordinator import (  # noqa: E402
+    PetSafeFeederCoordinator,
+)
+from custom_components.petsafe.history import PetSafeAccountHistory  # noqa: E402
+
+from .fake_petsafe import FEEDERS, FakePetSafe  # noqa: E402
+
+SCHEDULES = f"{FEEDERS}/feeder/schedules"
+
+
+def set_schedules(
+    tmp_path, server: FakePetSafe, desired: dict[str, int]
+) -> dict[str, dict]:
+    """Apply the desired schedules and return the schedule cache afterwards."""
+
+    async def run() -> dict[str, dict]:
+        client = server.create_client()
+        coordinator = PetSafeFeederCoordinator(
+            HomeAssistant(str(tmp_path)),
+            client,
+            {},
+            {},
+            RequestCoalescer(),
+            PetSafeAccountHistory(),
+        )
+        feeder = (await client.get_feeders())[0]
+        server.requests.clear()
+        await coordinator.async_set_schedules(feeder, desired)
+        return coordinator.schedules(feeder.api_name).by_time
+
+    return asyncio.run(run())
+
+
+def test_set_schedules_modifies_moves_and_deletes(tmp_path) -> None:
+    server = FakePetSafe()
+    server.add_feeder("feeder", {"07:00": 4, "12:00": 2, "18:00": 4})
+
+    cache = set_schedules(tmp_path, server, {"7:00": 2, "19:00": 4})
+
+    assert sorted(server.writes()) == [
+        ("DELETE", f"{SCHEDULES}/1003", None),
+        ("PUT", f"{SCHEDULES}/1001", {"time": "07:00", "amount": 2}),
+        ("PUT", f"{SCHEDULES}/1002", {"time": "19:00", "amount": 4}),
+    ]
+    assert cache == {
+        "07:00": {"id": "1001", "time": "07:00", "amount": 2},
+        "19:00": {"id": "1002", "time": "19:00", "amount": 4},
+    }
+    assert list(server.schedules["feeder"].values()) == list(cache.values())
+
+
+def test_set_schedules_adds_missing_times(tmp_path) -> None:
+    server = FakePetSafe()
+    server.add_feeder("feeder", {"07:00": 4})
+
+    cache = set_schedules(tmp_path, server, {"07:00": 4, "18:00": 3})
+
+    assert server.writes() == [("POST", SCHEDULES, {"time": "18:00", "amount": 3})]
+    assert cache == {
+        "07:00": {"id": "1001", "time": "07:00", "amount": 4},
+        "18:00": {"id": "1002", "time": "18:00", "amount": 3},
+    }
+
+
+def test_set_schedules_without_changes_only_reads(tmp_path) -> None:
+    server = FakePetSafe()
+    server.add_feeder("feeder", {"07:00": 4, "18:00": 4})
+
+    cache = set_schedules(tmp_path, server, {"7:00:00": 4, "18:00": 4})
+
+    assert server.requests == [("GET", SCHEDULES, None)]
+    assert set(cache) == {"07:00", "18:00"}
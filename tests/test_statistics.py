@@ -0,0 +1,115 @@
+"""Tests of the statistics import against an in-memory recorder."""
+from __future__ import annotations
+
+import asyncio
+import datetime
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.components.recorder.models import StatisticMetaData  # noqa: E402
+
+from custom_components.petsafe import statistics  # noqa: E402
+from custom_components.petsafe.const import (  # noqa: E402
+    RAKE_FINISHED,
+    STATISTICS_LOOKBACK_HOURS,
+)
+from custom_components.petsafe.history import DeviceHistory  # noqa: E402
+
+STATISTIC_ID = "petsafe:litterbox_rake_cycles"
+METADATA = StatisticMetaData(
+    has_mean=False,
+    has_sum=True,
+    name="Litterbox Rake Cycles",
+    source="petsafe",
+    statistic_id=STATISTIC_ID,
+    unit_of_measurement=None,
+)
+END = datetime.datetime(2024, 3, 1, 12, tzinfo=datetime.timezone.utc)
+
+
+def hours_ago(hours: float) -> int:
+    """Return the timestamp in milliseconds of some hours before the end."""
+    return int((END.timestamp() - hours * 3600) * 1000)
+
+
+class FakeRecorder:
+    """Keeps the imported rows of one statistic by start, newest first."""
+
+    def __init__(self):
+        self.rows: dict[float, dict] = {}
+
+    async def async_add_executor_job(self, target, *args):
+        return target(*args)
+
+    def get_last_statistics(self, hass, number_of_stats, statistic_id, *args):
+        rows = sorted(self.rows.values(), key=lambda x: x["start"], reverse=True)
+        return {statistic_id: rows[:number_of_stats]} if rows else {}
+
+    def add_external_statistics(self, hass, metadata, rows) -> None:
+        for row in rows:
+            start = row["start"].timestamp()
+            self.rows[start] = {
+                "start": start,
+                "state": row["state"],
+                "sum": row["sum"],
+            }
+
+    def sums(self) -> dict[float, int]:
+        """Return the sum of every hour, keyed by hours before the end."""
+        return {
+            (END.timestamp() - x) / 3600: row["sum"] for x, row in self.rows.items()
+        }
+
+
+@pytest.fixture
+def recorder(monkeypatch) -> FakeRecorder:
+    recorder = FakeRecorder()
+    monkeypatch.setattr(statistics, "get_instance", lambda hass: recorder)
+    monkeypatch.setattr(statistics, "get_last_statistics", recorder.get_last_statistics)
+    monkeypatch.setattr(
+        statistics, "async_add_external_statistics", recorder.add_external_statistics
+    )
+    return recorder
+
+
+def run_import(history: DeviceHistory) -> None:
+    importer = statistics.PetSafeStatistics(None, None)
+    asyncio.run(
+        importer._async_import_statistic(history, RAKE_FINISHED, False, METADATA, END)
+    )
+
+
+def test_late_events_are_added_to_imported_hours(recorder) -> None:
+    history = DeviceHistory()
+    history.add(RAKE_FINISHED, hours_ago(STATISTICS_LOOKBACK_HOURS + 5.5))
+    history.add(RAKE_FINISHED, hours_ago(2.5))
+    run_import(history)
+    assert recorder.sums() == {STATISTICS_LOOKBACK_HOURS + 6: 1, 3: 2}
+
+    # A late event of an imported hour and one of an hour without rows.
+    history.add(RAKE_FINISHED, hours_ago(2.25))
+    history.add(RAKE_FINISHED, hours_ago(4.5))
+    history.add(RAKE_FINISHED, hours_ago(0.5))
+    run_import(history)
+
+    assert recorder.sums() == {STATISTICS_LOOKBACK_HOURS + 6: 1, 5: 2, 3: 4, 1: 5}
+
+
+def test_import_catches_up_from_the_last_imported_hour(recorder) -> None:
+    history = DeviceHistory()
+    history.add(RAKE_FINISHED, hours_ago(STATISTICS_LOOKBACK_HOURS + 10.5))
+    run_import(history)
+
+    # Hours older than the window are imported when no run covered them.
+    history.add(RAKE_FINISHED, hours_ago(STATISTICS_LOOKBACK_HOURS + 10.25))
+    history.add(RAKE_FINISHED, hours_ago(STATISTICS_LOOKBACK_HOURS + 2.5))
+    history.add(RAKE_FINISHED, hours_ago(1.5))
+    run_import(history)
+
+    assert recorder.sums() == {
+        STATISTICS_LOOKBACK_HOURS + 11: 2,
+        STATISTICS_LOOKBACK_HOURS + 3: 3,
+        2: 4,
+    }